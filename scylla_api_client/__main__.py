@@ -1,4 +1,23 @@
-from .cli import main
+import sys
+
+# imported first, to time the rest of the startup
+from . import timing
+timing.mark_start()
+
+from .daemon_client import forward
+
+
+def main():
+    if sys.argv[1:2] == ['--complete']:
+        # shell completion lookups only read the local completion index
+        from .completion import complete_main
+        sys.exit(complete_main(sys.argv[2:]))
+    # forward to a running daemon, and only load the full cli when there is none
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    from .cli import main as cli_main
+    cli_main()
 
 if __name__ == '__main__':
     main()
@@ -2,82 +2,131 @@
 Simple Scylla REST API client module
 """
 
+from __future__ import annotations
+
+import difflib
 import logging
 import re
 import json
-from argparse import ArgumentParser
-from pprint import PrettyPrinter
-
-from .rest.scylla_rest_client import ScyllaRestClient
+import string
+import threading
+from typing import TYPE_CHECKING
+
+from .rest import DEFAULT_POOL_SIZE
+from .command_index import CommandIndex
+from .schema_cache import SchemaCache
+from . import streaming, timing
+
+# argparse, pprint and the http client are imported where they are used,
+# so that the cli starts without them when it does not send requests
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from pprint import PrettyPrinter
+    from .rest.scylla_rest_client import ScyllaRestClient
+    from .rest.response_cache import ResponseCache
+    from .rest.resilience import RetryPolicy, Timeouts
 
 log = logging.getLogger('scylla.api')
 
+class ScyllaApiError(Exception):
+    pass
+
+class MissingArgumentError(ScyllaApiError):
+    pass
+
+class CommandNotFoundError(ScyllaApiError):
+    pass
+
+class NodeConnectionError(ScyllaApiError):
+    pass
+
+class ApiResponseError(ScyllaApiError):
+    """
+    Raised for a response with a non-200 status.
+    body holds the decoded json error, or the response text.
+    """
+    def __init__(self, status_code:int, body, resource_path:str=''):
+        self.status_code = status_code
+        self.body = body
+        self.resource_path = resource_path
+        message = body.get("message", body) if isinstance(body, dict) else body
+        super().__init__(f"{resource_path}: {status_code} {message}")
+
+
+def decode_response(res):
+    """
+    Return the json value of a response body, its text if it is not json, or None if it is empty.
+    """
+    if not res.content:
+        return None
+    try:
+        return res.json()
+    except ValueError:
+        return res.text
+
+
+def _param_value(value):
+    # option values are sent as the cli would send them
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (list, tuple)):
+        return [_param_value(v) for v in value]
+    return str(value)
+
 """
 A dictionary that keeps the insertion order
 """
 class OrderedDict:
-    def __init__(self):
-        self._pos = 0
-        self._count = 0
-        self._cur_pos = 0
+    # values are kept in insertion order, with an index of their position by key.
+    # entries are only appended, so concurrent readers see a consistent prefix.
+    __slots__ = ('_keys', '_values', '_index')
 
-        self.by_key = dict()
-        self.by_pos = dict()
+    def __init__(self):
+        self._keys = []
+        self._values = []
+        self._index = dict()
 
     def insert(self, key, value):
         assert type(key) is not int
-        self.by_key[key] = value
-        self.by_pos[self._pos] = key
-        self._pos += 1
-        self._count += 1
+        pos = self._index.get(key)
+        if pos is not None:
+            self._values[pos] = value
+            return
+        self._values.append(value)
+        self._keys.append(key)
+        self._index[key] = len(self._keys) - 1
 
     def __add__(self, key, value):
         self.insert(key, value)
 
     def __getitem__(self, idx_or_key):
         if type(idx_or_key) is int:
-            if idx_or_key not in self.by_pos:
+            if not 0 <= idx_or_key < len(self._keys):
                 raise IndexError('OrderedDict index out of range')
-            key = self.by_pos[idx_or_key]
-        else:
-            key = idx_or_key
-        return self.by_key[key]
+            return self._values[idx_or_key]
+        return self._values[self._index[idx_or_key]]
+
+    def __contains__(self, key):
+        return key in self._index
 
     def __repr__(self):
-        s = ''
-        for key in self.keys():
-            if s:
-                s += ', '
-            value = self.by_key[key]
-            s += f"{{{key}: {value}}}"
+        s = ', '.join(f"{{{key}: {value}}}" for key, value in zip(self._keys, self._values))
         return f"OrderedDict({s})"
 
     def __len__(self):
-        return len(self.by_key)
+        return len(self._keys)
 
     def __iter__(self):
-        self._cur_pos = 0
-        return self
-
-    def __next__(self):
-        next_key = self.by_pos[self._cur_pos]
-        self._cur_pos += 1
-        if self._cur_pos >= self._count:
-            raise StopIteration
-        return next_key
+        return iter(self._keys)
 
     def count(self) -> int:
-        return self._count
+        return len(self._keys)
 
     def keys(self):
-        for i in range(0, self._pos):
-            if i not in self.by_pos:
-                continue
-            yield self.by_pos[i]
+        return iter(self._keys)
 
     def items(self):
-        for key in self.keys():
-            yield self.by_key[key]
+        return iter(self._values)
 
 class ScyllaApiOption:
     # init Command
@@ -111,6 +160,66 @@ class ScyllaApiOption:
         parser.add_argument(f"--{self.name}", dest=self.name, help=self.help, nargs=1, required=self.required,
                             choices=self.allowed_values if self.allowed_values else None)
 
+
+def _coerce_value(value):
+    # argparse gives the values of nargs=1 options as one element lists
+    if type(value) is list:
+        return value[0] if len(value) == 1 else ','.join(value)
+    return value
+
+
+class RequestBuilder:
+    """
+    A method request compiled for a path format: the format is split once into a
+    %-template of its path arguments, so that building a request is a pass over
+    the path and query option names, with no per-option branching.
+    """
+    __slots__ = ('path_format', 'path_names', 'query_names', 'method_name', '_template', '_fields')
+
+    def __init__(self, path_format:str, path_names:list, query_names:list, method_name:str=''):
+        """
+        :param method_name: 'command METHOD' name reported for missing path arguments
+        """
+        self.path_format = path_format
+        self.path_names = tuple(path_names)
+        self.query_names = tuple(query_names)
+        self.method_name = method_name
+        template = []
+        fields = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(path_format):
+            template.append(literal.replace('%', '%%'))
+            if field is not None:
+                if format_spec or conversion:
+                    raise ValueError(f"Unsupported path argument '{{{field}}}' in {path_format}")
+                template.append('%s')
+                fields.append(field)
+        self._template = ''.join(template)
+        self._fields = tuple(fields)
+
+    def __repr__(self):
+        return f"RequestBuilder(path_format={self.path_format}, path_names={self.path_names}, query_names={self.query_names})"
+
+    def build(self, args:dict):
+        """
+        Pop the option values of the request from args.
+        Returns a (resource_path, query_params) tuple.
+        Raises MissingArgumentError when a path argument is missing.
+        """
+        pop = args.pop
+        try:
+            path_values = {name: _coerce_value(pop(name)) for name in self.path_names}
+            resource_path = self._template % tuple(path_values[field] for field in self._fields)
+        except KeyError as e:
+            raise MissingArgumentError(f"{self.method_name}: missing required value path argument '{e.args[0]}'") from None
+        # options left unset are not sent
+        query_params = dict()
+        for name in self.query_names:
+            value = pop(name, None)
+            if value is not None:
+                query_params[name] = _coerce_value(value)
+        return resource_path, query_params
+
+
 class ScyllaApiCommand:
     class Method:
         GET = 0
@@ -129,13 +238,19 @@ class ScyllaApiCommand:
                      desc:str='',
                      module_name:str='',
                      command_name:str='',
-                     options:OrderedDict=None):
+                     options:OrderedDict=None,
+                     path:str=''):
             self.kind = kind
             self.module_name = module_name
             self.command_name = command_name
+            # the api path of the method, with its path parameters unresolved
+            self.path = path
             self.desc = desc
             self.options = options or OrderedDict()
+            # the parser, help text and request builder are generated on first use
             self.parser = None
+            self._help = None
+            self._request_builder = None
             self.rest_client = scylla_rest_client
             log.debug(f"Created {self.__repr__()}")
 
@@ -151,18 +266,35 @@ class ScyllaApiCommand:
 
         def add_option(self, option:ScyllaApiOption):
             self.options.insert(option.name, option)
+            self._request_builder = None
 
         def generate_parser(self):
+            from argparse import ArgumentParser
             parser = ArgumentParser(prog=f"{self.module_name} {self.command_name} {self.kind_to_str[self.kind]}", description=self.desc, add_help=False)
             for opt in self.options.items():
                 opt.add_argument(parser)
             self.parser = parser
 
+        def get_parser(self) -> ArgumentParser:
+            """
+            Return the method argument parser, generating it the first time it is needed.
+            """
+            if not self.parser:
+                with timing.phase("generate parser"):
+                    self.generate_parser()
+            return self.parser
+
         def get_help(self):
-            help_str = f"{self.kind_to_str[self.kind]} - {self.desc}\n\n"
-            usage = f"usage: {self.module_name} {self.command_name} {self.kind_to_str[self.kind]}"
-            required_help = ''
-            optional_help = ''
+            # the help text only depends on the schema, render it once
+            if self._help is None:
+                self._help = self.render_help()
+            return self._help
+
+        def render_help(self):
+            kind_str = self.kind_to_str[self.kind]
+            usage = [f"usage: {self.module_name} {self.command_name} {kind_str}"]
+            required_help = []
+            optional_help = []
 
             def opt_help(name:str, param:str='', help:str='', justify=31):
                 pfx = f"  {name} {param}"
@@ -180,62 +312,115 @@ class ScyllaApiCommand:
 
             for opt in self.options.items():
                 if opt.required:
-                    usage += f" --{opt.name} {param_help(opt)}"
-                    oh = opt_help(f"--{opt.name}", param=param_help(opt), help=opt.help)
-                    required_help += f"\n{oh}"
+                    usage.append(f"--{opt.name} {param_help(opt)}")
+                    required_help.append(opt_help(f"--{opt.name}", param=param_help(opt), help=opt.help))
             for opt in self.options.items():
                 if not opt.required:
-                    usage += f" [--{opt.name} {param_help(opt)}]"
-                    oh = opt_help(f"--{opt.name}", param=param_help(opt), help=opt.help)
-                    optional_help += f"\n{oh}"
+                    usage.append(f"[--{opt.name} {param_help(opt)}]")
+                    optional_help.append(opt_help(f"--{opt.name}", param=param_help(opt), help=opt.help))
 
-            help_str += usage
+            sections = [f"{kind_str} - {self.desc}", ' '.join(usage)]
             if required_help:
-                help_str += f"\n\nRequired arguments:{required_help}"
+                sections.append('\n'.join(["Required arguments:"] + required_help))
             if optional_help:
-                help_str += f"\n\nOptional arguments:{optional_help}"
-            
-            return help_str
-
-        def invoke(self, path_format: str, args: dict, pretty_printer:PrettyPrinter=None):
-            path_dict = dict()
-            params_dict = dict()
-            kind_str = self.kind_to_str[self.kind]
-
-            def get_value(opt_name: str):
-                value = args.pop(opt_name)
-                if type(value) is list:
-                    if len(value) == 1:
-                        value = value[0]
-                    else:
-                        value = ','.join(value)
-                return value
-
-            for opt in self.options.items():
-                if opt.param_type == 'path':
-                    try:
-                        path_dict[opt.name] = get_value(opt.name)
-                    except KeyError:
-                        print(f"{self.command_name} {kind_str}: missing required value path argument '{opt.name}'")
-                        return
-                else:
-                    try:
-                        params_dict[opt.name] = get_value(opt.name)
-                    except KeyError:
-                        pass
-
-            res = self.rest_client.dispatch_rest_method(rest_method_kind=kind_str,
-                                                        resource_path=path_format.format(**path_dict),
-                                                        query_params=params_dict)
+                sections.append('\n'.join(["Optional arguments:"] + optional_help))
+            return '\n\n'.join(sections)
+
+        def get_request_builder(self, path_format: str) -> RequestBuilder:
+            """
+            Return the request builder of the method for path_format, compiling it the first time it is needed.
+            """
+            builder = self._request_builder
+            if builder is None or builder.path_format != path_format:
+                options = list(self.options.items())
+                builder = RequestBuilder(path_format,
+                                         [opt.name for opt in options if opt.param_type == 'path'],
+                                         [opt.name for opt in options if opt.param_type != 'path'],
+                                         f"{self.command_name} {self.kind_to_str[self.kind]}")
+                self._request_builder = builder
+            return builder
+
+        def build_request(self, path_format: str, args: dict):
+            """
+            Resolve the method resource path and query parameters from the parsed arguments.
+            Raises MissingArgumentError when a path argument is missing.
+            Shared by the sync and async clients.
+            """
+            return self.get_request_builder(path_format).build(args)
+
+        def send(self, resource_path: str, query_params: dict, stream: bool = False):
+            """
+            Send the request and return its response.
+            Raises ApiResponseError for a non-200 status, and NodeConnectionError if the node could not be reached.
+            """
+            from requests.exceptions import RequestException
+            try:
+                res = self.rest_client.dispatch_rest_method(rest_method_kind=self.kind_to_str[self.kind],
+                                                            path_template=self.path or None,
+                                                            resource_path=resource_path,
+                                                            query_params=query_params,
+                                                            stream=stream)
+            except RequestException as e:
+                raise NodeConnectionError(str(e)) from e
+            if res is None:
+                raise NodeConnectionError(f"Could not connect to {self.rest_client.host}:{self.rest_client.port}")
             if res.status_code != 200:
-                print(res.json())
-            elif not pretty_printer:
-                print(res.text)
-            else:
-                pretty_printer.pprint(res.json())
+                with res:
+                    raise ApiResponseError(res.status_code, decode_response(res), resource_path)
+            return res
+
+        def call(self, path_format: str, args: dict, raw: bool = False):
+            """
+            Send the request and return the decoded json response, or the response body bytes with raw.
+            Raises MissingArgumentError, ApiResponseError or NodeConnectionError.
+            """
+            resource_path, params_dict = self.build_request(path_format, dict(args))
+            with self.send(resource_path, params_dict) as res:
+                return res.content if raw else decode_response(res)
+
+        def invoke(self, path_format: str, args: dict, pretty_printer:PrettyPrinter=None, out=None, json_stream:bool=False,
+                   watch:float=None, watch_count:int=None):
+            """
+            Send the request and print the response.
+            The response body is streamed: it is written as is to out (a binary file, stdout by default)
+            unless it is pretty printed, or with json_stream, the elements of a top-level json array are
+            printed one per line as they arrive.
+            With watch, the request is repeated every watch seconds, watch_count times or until interrupted.
+            """
+            try:
+                resource_path, params_dict = self.build_request(path_format, args)
+            except MissingArgumentError as e:
+                print(e)
+                return
+
+            if watch:
+                from .watch import Watcher
+                Watcher(self.rest_client, self.kind_to_str[self.kind], resource_path, params_dict, watch,
+                        path_template=self.path or None).run(count=watch_count)
+                return
+
+            try:
+                res = self.send(resource_path, params_dict, stream=True)
+            except ApiResponseError as e:
+                print(e.body)
+                return
+            except NodeConnectionError as e:
+                print(e)
+                return
+            with res, timing.phase("read and print response"):
+                if json_stream:
+                    for value in streaming.iter_json_array(res.iter_content(streaming.DEFAULT_CHUNK_SIZE)):
+                        if pretty_printer:
+                            pretty_printer.pprint(value)
+                        else:
+                            print(json.dumps(value))
+                elif pretty_printer:
+                    pretty_printer.pprint(res.json())
+                elif not streaming.write_stream(res.iter_content(streaming.DEFAULT_CHUNK_SIZE), out) and out is None:
+                    print()
 
     # init Command
-    def __init__(self, module_name:str, command_name:str, host: str, port: str):
+    def __init__(self, module_name:str, command_name:str, host: str, port: str, rest_client:ScyllaRestClient=None):
         self.module_name = module_name
         self.name = command_name
         # name format is used for generting the command url
@@ -244,6 +429,11 @@ class ScyllaApiCommand:
         self.methods = dict()
         self._host = host
         self._port = port
+        # all methods share the command rest client
+        if rest_client is None:
+            from .rest.scylla_rest_client import ScyllaRestClient
+            rest_client = ScyllaRestClient(host, port)
+        self.rest_client = rest_client
         log.debug(f"Created {self.__repr__()}")
 
     def __repr__(self):
@@ -273,8 +463,9 @@ class ScyllaApiCommand:
                 log.warn(f"Operation not supported yet: {json.dumps(operation_def, indent=4)}")
                 continue
 
-            method = ScyllaApiCommand.Method(scylla_rest_client=ScyllaRestClient(self._host, self._port),
-                                             kind=kind, desc=operation_def["summary"], module_name=self.module_name, command_name=self.name)
+            method = ScyllaApiCommand.Method(scylla_rest_client=self.rest_client,
+                                             kind=kind, desc=operation_def["summary"], module_name=self.module_name, command_name=self.name,
+                                             path=self.name_format)
             for param_def in operation_def["parameters"]:
                 method.add_option(ScyllaApiOption(param_def["name"],
                     required=param_def.get("required", False),
@@ -285,7 +476,11 @@ class ScyllaApiCommand:
                     path=command_json["path"]))
             self.add_method(method)
 
-    def invoke(self, node_address:str, port:int, argv=[], pretty_printer:PrettyPrinter=None):
+    def parse_invocation(self, argv=[]):
+        """
+        Select the method and parse its options from argv.
+        Returns a (method, args) tuple, or None if help was printed or argv is invalid.
+        """
         method_kind = None
         if len(argv) and argv[0] in self.Method.str_to_kind:
             method_kind = self.Method.str_to_kind[argv[0]]
@@ -293,52 +488,106 @@ class ScyllaApiCommand:
         if method_kind is None:
             if len(self.methods) == 1:
                 method_kind = list(self.methods.keys())[0]
-        elif not self.methods[method_kind]:
+        elif method_kind not in self.methods:
             print(f"{self.name}: {self.Method.kind_to_str[method_kind]} method is not supported")
-            return
+            return None
 
         log.debug(f"Invoking {self.name} {self.Method.kind_to_str[method_kind] if method_kind is not None else 'None'} {argv}")
-        print_help = '-h' in argv or '--help' in argv
-        kind_strings = []
-        for kind, m in self.methods.items():
-            kind_str = self.Method.kind_to_str[kind]
-            kind_strings.append(kind_str)
-            if not m.parser:
-                m.generate_parser()
-            if print_help and (method_kind is None or method_kind == kind):
-                if len(kind_strings) > 1:
-                    print('---')
-                print(f"{m.get_help()}")
-                # m.parser.print_help()
-        if print_help:
-            return
+        kind_strings = [self.Method.kind_to_str[kind] for kind in self.methods]
+        if '-h' in argv or '--help' in argv:
+            helps = [m.get_help() for kind, m in self.methods.items() if method_kind is None or method_kind == kind]
+            print('\n---\n'.join(helps))
+            return None
         if method_kind is None:
             print(f"{self.name}: request method not specified. Use one of {'|'.join(kind_strings)}.")
-            return
+            return None
         try:
             method = self.methods[method_kind]
         except KeyError:
             print(f"{self.name}: {method_kind} method is not supported")
-            return
-        args = vars(method.parser.parse_args(argv))
+            return None
+        # only the dispatched method needs a parser
+        args = vars(method.get_parser().parse_args(argv))
         provided_options = set(key for key, val in args.items() if val)
         required_options = set(opt.name for opt in method.options.items() if opt.required)
         missing_options = required_options - provided_options
         if missing_options:
             print(f"Missing required option{'s' if len(missing_options) > 1 else ''} {missing_options}")
+            return None
+        return method, args
+
+    def prepare_call(self, method:str='GET', **params):
+        """
+        Select the method and check the option values of a call.
+        Returns a (method, args) tuple.
+        Raises ScyllaApiError for an unsupported method or unknown options, and MissingArgumentError
+        for missing required options. Shared by the sync and async clients.
+        """
+        try:
+            m = self.methods[self.Method.str_to_kind[method.upper()]]
+        except KeyError:
+            raise ScyllaApiError(f"{self.name}: {method} method is not supported")
+        args = {name: _param_value(value) for name, value in params.items() if value is not None}
+        unknown_options = set(args) - set(m.options.keys())
+        if unknown_options:
+            raise ScyllaApiError(f"{self.name} {m.kind_to_str[m.kind]}: unknown option{'s' if len(unknown_options) > 1 else ''} {unknown_options}")
+        missing_options = set(opt.name for opt in m.options.items() if opt.required) - set(args)
+        if missing_options:
+            raise MissingArgumentError(f"{self.name} {m.kind_to_str[m.kind]}: missing required option{'s' if len(missing_options) > 1 else ''} {missing_options}")
+        return m, args
+
+    def call(self, method:str='GET', raw:bool=False, **params):
+        """
+        Call a method of the command with the given option values, and return the decoded json
+        response, or the response body bytes with raw.
+        Raises ScyllaApiError for an unsupported method or unknown options, MissingArgumentError
+        for missing required options, ApiResponseError or NodeConnectionError.
+        """
+        m, args = self.prepare_call(method, **params)
+        return m.call(self.name_format, args, raw=raw)
+
+    def invoke(self, node_address:str, port:int, argv=[], pretty_printer:PrettyPrinter=None, out=None, json_stream:bool=False,
+               watch:float=None, watch_count:int=None):
+        invocation = self.parse_invocation(argv)
+        if invocation is None:
             return
-        method.invoke(path_format=self.name_format, args=args, pretty_printer=pretty_printer)
+        method, args = invocation
+        method.invoke(path_format=self.name_format, args=args, pretty_printer=pretty_printer, out=out, json_stream=json_stream,
+                      watch=watch, watch_count=watch_count)
 
 class ScyllaApiModule:
     # init Module
-    def __init__(self, name:str, desc:str='', commands:OrderedDict=None):
+    def __init__(self, name:str, desc:str='', commands:OrderedDict=None, loader=None):
         self.desc = desc
         self.name = name
-        self.commands = commands or OrderedDict()
+        # when a loader is given, commands are loaded by calling loader(module, commands)
+        # the first time they are accessed, and again on the next access if it returns False
+        self._loader = loader
+        self._commands = commands or (OrderedDict() if loader is None else None)
+        # a loaded api may be shared by threads, the first of which loads the commands
+        self._load_lock = threading.Lock()
         log.debug(f"Created {self.__repr__()}")
 
     def __repr__(self):
-        return f"ApiModule(name={self.name}, desc={self.desc}, commands={self.commands})"
+        commands = self._commands if self.loaded else '<not loaded>'
+        return f"ApiModule(name={self.name}, desc={self.desc}, commands={commands})"
+
+    @property
+    def loaded(self) -> bool:
+        return self._commands is not None
+
+    @property
+    def commands(self) -> OrderedDict:
+        commands = self._commands
+        if commands is None:
+            with self._load_lock:
+                commands = self._commands
+                if commands is None:
+                    commands = OrderedDict()
+                    if self._loader(self, commands) is False:
+                        return commands
+                    self._commands = commands
+        return commands
 
     def __str__(self):
         s = f"{self.name}: {self.desc}"
@@ -358,12 +607,43 @@ class ScyllaApiModule:
 class ScyllaApi:
     DEFAULT_HOST = "localhost"
     DEFAULT_PORT = 10000
+    DEFAULT_FETCH_WORKERS = 8
 
-    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, schema_cache:SchemaCache=None,
+                 pool_size:int=DEFAULT_POOL_SIZE, response_cache:ResponseCache=None,
+                 timeouts:Timeouts=None, retry_policy:RetryPolicy=None):
         self._host = host
         self._port = port
+        # applied to the client from the first request, the schema fetches included
+        self._timeouts = timeouts
+        self._retry_policy = retry_policy
         self.modules = OrderedDict()
-        self.client = ScyllaRestClient(host=self._host, port=self._port)
+        # the client and its pooled session are shared by all the api methods
+        self.client = self.create_client(pool_size)
+        if response_cache is not None:
+            self.client.response_cache = response_cache
+        self.schema_cache = schema_cache
+        # commands of all the loaded modules, by name
+        self.command_index = CommandIndex()
+        self._schema = None
+        self._module_schemas = dict()
+        self._schema_version = None
+        # the schema cached for another release version, revalidated document by document
+        self._stale_schema = None
+        self._stale_modules = dict()
+
+    def create_client(self, pool_size:int):
+        from .rest.scylla_rest_client import ScyllaRestClient
+        return ScyllaRestClient(host=self._host, port=self._port, pool_size=pool_size,
+                                timeouts=self._timeouts, retry_policy=self._retry_policy)
+
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def port(self):
+        return self._port
 
     def __repr__(self):
         return f"ScyllaApi(node_address={self._host}, port={self._port}, modules={self.modules})"
@@ -380,52 +660,265 @@ class ScyllaApi:
     def add_module(self, module:ScyllaApiModule):
         self.modules.insert(module.name, module)
 
-    def load(self):
+    def get_command(self, command_path:str) -> ScyllaApiCommand:
+        """
+        Return the command for a 'module/command' path.
+        Raises KeyError if the module or command does not exist.
+        """
+        command_path = command_path.strip(' /')
+        module_name, _, command_name = command_path.partition('/')
+        return self.modules[module_name].commands[command_name]
+
+    def find_command(self, argv:list):
+        """
+        Resolve the command named by argv, given as 'module command', 'module/command'
+        or a command name that is unique across all modules.
+        Returns a (command, argv) tuple with the remaining arguments.
+        Raises CommandNotFoundError if the command cannot be resolved.
+        """
+        if not argv:
+            raise CommandNotFoundError("Command not specified")
+        name = argv[0].strip(' /')
+        if name in self.modules:
+            if len(argv) < 2:
+                raise CommandNotFoundError(f"Command not specified for module '{name}'")
+            module_name, command_name, argv = name, argv[1].strip(' /'), argv[2:]
+        else:
+            module_name, sep, command_name = name.partition('/')
+            argv = argv[1:]
+            if not sep:
+                return self._find_command_by_name(name), argv
+            if module_name not in self.modules:
+                raise CommandNotFoundError(f"Could not find module '{module_name}'{self._did_you_mean(module_name, self.modules)}")
+
+        commands = self.modules[module_name].commands
+        if command_name not in commands:
+            raise CommandNotFoundError(f"Could not find command '{command_name}' in module '{module_name}'"
+                                       f"{self._did_you_mean(command_name, commands)}")
+        return commands[command_name], argv
+
+    def _find_command_by_name(self, command_name:str) -> ScyllaApiCommand:
+        # every module must be loaded for the command index to be complete
+        self.load_all()
+        candidates = self.command_index.lookup(command_name)
+        if len(candidates) > 1:
+            paths = ', '.join(f"{c.module_name}/{c.name}" for c in candidates)
+            raise CommandNotFoundError(f"Command '{command_name}' exists in multiple modules: {paths}. Specify 'module/command' to uniquely identify the command.")
+        if not candidates:
+            suggestions = self.command_index.suggest(command_name)
+            did_you_mean = f". Did you mean: {', '.join(suggestions)}?" if suggestions else ''
+            raise CommandNotFoundError(f"Could not find command '{command_name}'{did_you_mean}")
+        return candidates[0]
+
+    @staticmethod
+    def _did_you_mean(name:str, names:OrderedDict) -> str:
+        suggestions = difflib.get_close_matches(name, list(names.keys()), n=3)
+        return f". Did you mean: {', '.join(suggestions)}?" if suggestions else ''
+
+    def call(self, command_path:str, method:str='GET', raw:bool=False, **params):
+        """
+        Call a command method, named as 'module/command' or by a command name unique across modules,
+        and return the decoded json response, or the response body bytes with raw.
+        Raises CommandNotFoundError, ScyllaApiError for an unsupported method or unknown options,
+        MissingArgumentError, ApiResponseError for a non-200 status, or NodeConnectionError.
+
+        Usage::
+            scylla_api = ScyllaApi("localhost")
+            scylla_api.load()
+            keyspaces = scylla_api.call("storage_service/keyspaces", type="user")
+        """
+        command, _ = self.find_command([command_path])
+        return command.call(method, raw=raw, **params)
+
+    def load(self, refresh_schema:bool=False):
+        """
+        Load the api module index from the node, or from the schema cache
+        when it holds a schema for the node's current release version.
+        A schema cached for another version is revalidated instead: its documents that
+        came with ETag or Last-Modified validators are requested conditionally, and
+        only fetched again if they changed.
+        Module documents are fetched lazily, the first time the module commands are accessed.
+        """
+        schema = None
+        self._schema_version = None
+        self._stale_schema = None
+        self._stale_modules = dict()
+        if self.schema_cache is not None:
+            self._schema_version = self.client.get_release_version()
+            entry = None if refresh_schema else self.schema_cache.get_entry(self._host, self._port)
+            if entry is None:
+                log.debug(f"No cached schema for {self._host}:{self._port}")
+            elif self._schema_version is not None and entry.get("version") == self._schema_version:
+                schema = entry["schema"]
+                log.debug(f"Using cached schema for {self._host}:{self._port} version {self._schema_version}")
+            else:
+                log.debug(f"Revalidating cached schema of {self._host}:{self._port} version {entry.get('version')} "
+                          f"with version {self._schema_version}")
+                self._stale_schema = entry["schema"]
+                self._stale_modules = {m["name"]: m for m in self._stale_schema.get("modules", [])
+                                       if "apis" in m and m.get("validators")}
+        if schema is None:
+            schema = self.fetch_index()
+            if schema is None:
+                return
+            self._store_schema(schema)
+        self.load_schema(schema)
+
+    def load_all(self, max_workers:int=DEFAULT_FETCH_WORKERS):
+        """
+        Load the commands of all modules.
+        Missing module documents are fetched concurrently using up to max_workers threads.
+        """
+        missing = [m for m in self._schema["modules"] if "apis" not in m] if self._schema else []
+        if missing:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+                # map() returns the results in the order of the module index
+                fetched = list(executor.map(self.fetch_module_apis, missing))
+            for module_schema, apis in zip(missing, fetched):
+                if apis is not None:
+                    module_schema["apis"] = apis
+            if any(apis is not None for apis in fetched):
+                self._store_schema(self._schema)
+        for module in self.modules.items():
+            module.commands
+
+    def fetch_index(self):
+        """
+        Fetch the api module index from the node and return it as a schema dict:
+        {"modules": [{"name": ..., "description": ..., "doc": ..., "swagger": "1.2"|"2.0"}, ...],
+         "validators": {"etag": ..., "last_modified": ...}}
+        The module "apis" are filled in by fetch_module_apis().
+        """
         # FIXME: handle service down, assert minimum version
-        top_json = self.client.get_raw_api_json()
-        if not top_json:
+        stale = self._stale_schema
+        with timing.phase("fetch api index"):
+            doc = self.client.get_api_document("/api-doc", stale.get("validators") if stale else None)
+        if doc.not_modified:
+            log.debug("Reusing the cached api index")
+            schema = {"modules": [{k: v for k, v in m.items() if k not in ("apis", "validators")}
+                                  for m in stale["modules"]]}
+        elif doc.api_json:
+            schema = self.parse_index(doc.api_json)
+        else:
             log.error("Service is down. Failed to get api data")
-            return
-        def add_command(module:ScyllaApiModule, command_name:str, command_json:str):
-                command = ScyllaApiCommand(module_name=module.name,
-                                           command_name=command_path,
-                                           host=self._host,
-                                           port=self._port)
-                command.load_json(command_json)
-                module.add_command(command)
+            return None
+        if doc.validators:
+            schema["validators"] = doc.validators
+        return schema
+
+    @staticmethod
+    def parse_index(top_json:dict) -> dict:
+        modules = []
         for module_def in top_json["apis"]:
-            # FIXME: handle service down, errors
-            module_json = self.client.get_raw_api_json(f"/api-doc{module_def['path']}/")
-            module_path = module_def['path'].strip(' /')
-            module = ScyllaApiModule(module_path, module_def['description'])
-            for command_json in module_json["apis"]:
-                command_path = command_json['path'].strip(' /')
-                if command_path.startswith(module_path):
-                    command_path = command_path[len(module_path)+1:]
-                add_command(module, command_path, command_json)
-            self.add_module(module)
-        for module_def in [json.loads('{ "path": "/v2", "description": "V2 API"}')]:
-            module_json = self.client.get_raw_api_json(module_def['path'])["paths"]
-            module_path = module_def['path'].strip(' /')
-            module = ScyllaApiModule(module_path, module_def['description'])
-            for command_path in module_json:
-                operations = []
-                for op, v2_meta in module_json[command_path].items():
-                    if op.upper() not in ["GET", "POST", "DELETE"]:
-                        continue
-                    operation = { "method": op }
-                    kw_trans = { "description": "summary", "produces": "produces", "parameters": "parameters"}
-                    for v2_kw, v1_kw in kw_trans.items():
-                        if v2_kw in v2_meta:
-                            operation[v1_kw] = v2_meta[v2_kw]
-                    operations.append(operation)
-                    if "produces" in v2_meta:
-                        operation["produces"] = v2_meta["produces"]
-                command_path = command_path.strip(' /')
-                if command_path.startswith(module_path):
-                    command_path = command_path[len(module_path)+1:]
-                json_str = f'{{"path": "{command_path}", "operations": {json.dumps(operations)} }}'
-                command_json = json.loads(json_str)
-                log.debug(f"{module_path} {command_path}: {command_json}")
-                add_command(module, command_path, command_json)
-            self.add_module(module)
+            modules.append({"name": module_def['path'].strip(' /'),
+                            "description": module_def['description'],
+                            "doc": f"/api-doc{module_def['path']}/",
+                            "swagger": "1.2"})
+        modules.append({"name": "v2", "description": "V2 API", "doc": "/v2", "swagger": "2.0"})
+        return {"modules": modules}
+
+    def fetch_module_apis(self, module_schema:dict):
+        """
+        Fetch a module api document and normalize it into a list of command_json
+        in the v1 (swagger 1.2) form, with the path relative to the module.
+        The document validators are kept in module_schema, and the apis of a revalidated
+        stale schema are reused when the node reports the document was not modified.
+        Returns None if the document could not be fetched.
+        """
+        # FIXME: handle service down, errors
+        stale = self._stale_modules.get(module_schema["name"])
+        if stale is not None and stale.get("doc") != module_schema["doc"]:
+            stale = None
+        with timing.phase(f"fetch module {module_schema['name']}"):
+            doc = self.client.get_api_document(module_schema["doc"], stale["validators"] if stale else None)
+        if doc.not_modified:
+            log.debug(f"Reusing the cached api of module {module_schema['name']}")
+            apis = stale["apis"]
+        elif doc.api_json:
+            apis = self.parse_module_apis(module_schema, doc.api_json)
+        else:
+            log.error(f"Failed to get api data for module {module_schema['name']}")
+            return None
+        if doc.validators:
+            module_schema["validators"] = doc.validators
+        return apis
+
+    @staticmethod
+    def parse_module_apis(module_schema:dict, module_json:dict) -> list:
+        if module_schema["swagger"] == "2.0":
+            return ScyllaApi.parse_v2_json(module_schema["name"], module_json)
+        return ScyllaApi.parse_module_json(module_schema["name"], module_json)
+
+    def _store_schema(self, schema:dict):
+        if self.schema_cache is not None and self._schema_version is not None:
+            self.schema_cache.put(self._host, self._port, self._schema_version, schema)
+
+    @staticmethod
+    def _command_path(module_path:str, path:str) -> str:
+        command_path = path.strip(' /')
+        if command_path.startswith(module_path):
+            command_path = command_path[len(module_path)+1:]
+        return command_path
+
+    @staticmethod
+    def parse_module_json(module_path:str, module_json:dict) -> list:
+        apis = []
+        for command_json in module_json["apis"]:
+            apis.append({"path": ScyllaApi._command_path(module_path, command_json['path']),
+                         "operations": command_json["operations"]})
+        return apis
+
+    @staticmethod
+    def parse_v2_json(module_path:str, v2_json:dict) -> list:
+        paths = v2_json["paths"]
+        apis = []
+        for path in paths:
+            operations = []
+            for op, v2_meta in paths[path].items():
+                if op.upper() not in ["GET", "POST", "DELETE"]:
+                    continue
+                operation = { "method": op }
+                kw_trans = { "description": "summary", "produces": "produces", "parameters": "parameters"}
+                for v2_kw, v1_kw in kw_trans.items():
+                    if v2_kw in v2_meta:
+                        operation[v1_kw] = v2_meta[v2_kw]
+                operations.append(operation)
+            command_json = {"path": ScyllaApi._command_path(module_path, path), "operations": operations}
+            log.debug(f"{module_path} {command_json['path']}: {command_json}")
+            apis.append(command_json)
+        return apis
+
+    def load_schema(self, schema:dict):
+        self._schema = schema
+        self._module_schemas = {m["name"]: m for m in schema["modules"]}
+        self.command_index = CommandIndex()
+        for module_schema in schema["modules"]:
+            self.add_module(ScyllaApiModule(module_schema["name"], module_schema["description"],
+                                            loader=self._load_module))
+
+    def _load_module(self, module:ScyllaApiModule, commands:OrderedDict) -> bool:
+        """
+        Load the commands of a lazily loaded module into commands.
+        Returns False if the module api could not be fetched, to retry on the next access.
+        """
+        module_schema = self._module_schemas[module.name]
+        if "apis" not in module_schema:
+            apis = self.fetch_module_apis(module_schema)
+            if apis is None:
+                return False
+            module_schema["apis"] = apis
+            self._store_schema(self._schema)
+        self._load_module_commands(module, commands, module_schema["apis"])
+        return True
+
+    def _load_module_commands(self, module:ScyllaApiModule, commands:OrderedDict, apis:list):
+        for command_json in apis:
+            command = ScyllaApiCommand(module_name=module.name,
+                                       command_name=command_json["path"],
+                                       host=self._host,
+                                       port=self._port,
+                                       rest_client=self.client)
+            command.load_json(command_json)
+            commands.insert(command.name, command)
+            self.command_index.add(module.name, command)
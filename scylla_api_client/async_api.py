@@ -0,0 +1,138 @@
+"""
+asyncio Scylla REST API client module
+"""
+
+import asyncio
+import logging
+
+import aiohttp
+
+from .api import ApiResponseError, NodeConnectionError, ScyllaApi, decode_response
+from .rest import DEFAULT_POOL_SIZE
+from .rest.async_scylla_rest_client import AsyncScyllaRestClient
+from .rest.resilience import Timeouts
+from .schema_cache import SchemaCache
+
+log = logging.getLogger('scylla.api')
+
+
+class AsyncScyllaApi(ScyllaApi):
+    """
+    asyncio counterpart of ScyllaApi.
+    load() fetches the whole schema concurrently, and methods are dispatched as coroutines
+    using the same ScyllaApiCommand.Method request building as the sync api.
+
+    Usage::
+        async with AsyncScyllaApi(host) as api:
+            await api.load()
+            res = await api.dispatch("system/uptime_ms")
+    """
+    DEFAULT_FETCH_CONCURRENCY = 16
+
+    def __init__(self, host: str = ScyllaApi.DEFAULT_HOST, port: int = ScyllaApi.DEFAULT_PORT,
+                 schema_cache:SchemaCache=None, pool_size:int=DEFAULT_POOL_SIZE, response_cache=None,
+                 timeouts:Timeouts=None, retry_policy=None):
+        # the async client neither caches responses nor retries requests
+        if response_cache is not None:
+            raise ValueError("AsyncScyllaApi does not support a response cache")
+        if retry_policy is not None:
+            raise ValueError("AsyncScyllaApi does not support a retry policy")
+        super().__init__(host=host, port=port, schema_cache=schema_cache, pool_size=pool_size, timeouts=timeouts)
+
+    def create_client(self, pool_size:int):
+        return AsyncScyllaRestClient(host=self._host, port=self._port, pool_size=pool_size, timeouts=self._timeouts)
+
+    def __repr__(self):
+        return f"AsyncScyllaApi(node_address={self._host}, port={self._port}, modules={self.modules})"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.client.close()
+
+    async def load(self, refresh_schema:bool=False, max_concurrency:int=DEFAULT_FETCH_CONCURRENCY):
+        """
+        Load the api schema from the node, or from the schema cache
+        when it holds a schema for the node's current release version.
+        Module documents missing from the cache are fetched concurrently.
+        """
+        schema = None
+        self._schema_version = None
+        if self.schema_cache is not None:
+            self._schema_version = await self.client.get_release_version()
+            if self._schema_version is None:
+                log.debug(f"Could not probe release version of {self._host}:{self._port}, bypassing schema cache")
+            elif not refresh_schema:
+                schema = self.schema_cache.get(self._host, self._port, self._schema_version)
+        if schema is None:
+            top_json = await self.client.get_raw_api_json()
+            if not top_json:
+                log.error("Service is down. Failed to get api data")
+                return
+            schema = self.parse_index(top_json)
+
+        missing = [m for m in schema["modules"] if "apis" not in m]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(module_schema:dict):
+            async with semaphore:
+                module_json = await self.client.get_raw_api_json(module_schema["doc"])
+            if not module_json:
+                log.error(f"Failed to get api data for module {module_schema['name']}")
+                return None
+            return self.parse_module_apis(module_schema, module_json)
+
+        # gather() returns the results in the order of the module index
+        for module_schema, apis in zip(missing, await asyncio.gather(*(fetch(m) for m in missing))):
+            if apis is not None:
+                module_schema["apis"] = apis
+        if missing:
+            self._store_schema(schema)
+        self.load_schema(schema)
+        self.load_all()
+
+    def load_all(self, max_workers:int=None):
+        # module documents are all fetched by load()
+        for module in self.modules.items():
+            module.commands
+
+    def fetch_module_apis(self, module_schema:dict):
+        log.error(f"Failed to get api data for module {module_schema['name']}")
+        return None
+
+    async def dispatch(self, command_path:str, method:str='GET', **params):
+        """
+        Invoke a 'module/command' method with the given parameters.
+        Returns the AsyncResponse, or None if the node could not be reached.
+        Raises the errors of ScyllaApiCommand.prepare_call().
+        """
+        command = self.get_command(command_path)
+        m, args = command.prepare_call(method, **params)
+        resource_path, query_params = m.build_request(command.name_format, args)
+        return await self.client.dispatch_rest_method(rest_method_kind=m.kind_to_str[m.kind],
+                                                      resource_path=resource_path,
+                                                      query_params=query_params)
+
+    async def call(self, command_path:str, method:str='GET', raw:bool=False, **params):
+        """
+        Call a command method, and return the decoded json response, or the response body bytes with raw.
+        Raises the same errors as ScyllaApi.call().
+        """
+        command, _ = self.find_command([command_path])
+        m, args = command.prepare_call(method, **params)
+        resource_path, query_params = m.build_request(command.name_format, args)
+        try:
+            res = await self.client.dispatch_rest_method(rest_method_kind=m.kind_to_str[m.kind],
+                                                         resource_path=resource_path,
+                                                         query_params=query_params)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise NodeConnectionError(str(e)) from e
+        if res is None:
+            raise NodeConnectionError(f"Could not connect to {self.client.host}:{self.client.port}")
+        if res.status_code != 200:
+            raise ApiResponseError(res.status_code, decode_response(res), resource_path)
+        return res.content if raw else decode_response(res)
@@ -0,0 +1,124 @@
+"""
+Run a batch of api commands over a single loaded ScyllaApi
+"""
+
+import io
+import json
+import logging
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+
+from requests.exceptions import RequestException
+
+from .api import ScyllaApi, ScyllaApiError, decode_response
+
+log = logging.getLogger('scylla.api.batch')
+
+
+class BatchRecord:
+    """
+    The result of a single batch line.
+    Either status_code and value are set, or error is.
+    """
+    def __init__(self, line_number:int, line:str, status_code:int=None, value=None, error:str=None):
+        self.line_number = line_number
+        self.line = line
+        self.status_code = status_code
+        self.value = value
+        self.error = error
+
+    def __repr__(self):
+        return f"BatchRecord(line_number={self.line_number}, line={self.line}, status_code={self.status_code}, " \
+               f"value={self.value}, error={self.error})"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code == 200
+
+    def to_json(self) -> dict:
+        record = {"line": self.line_number, "command": self.line}
+        if self.status_code is not None:
+            record["status"] = self.status_code
+        if self.error is not None:
+            record["error"] = self.error
+        else:
+            record["result"] = self.value
+        return record
+
+
+def read_lines(f) -> list:
+    """
+    Return the (line_number, line) pairs of the commands in f.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    lines = []
+    for line_number, line in enumerate(f, start=1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            lines.append((line_number, line))
+    return lines
+
+
+class Batch:
+    def __init__(self, scylla_api:ScyllaApi):
+        self.scylla_api = scylla_api
+
+    def prepare(self, line_number:int, line:str):
+        """
+        Resolve and parse a batch line into the request to send.
+        Returns a (method, resource_path, query_params) tuple, or a BatchRecord holding the error.
+        """
+        try:
+            command, argv = self.scylla_api.find_command(shlex.split(line))
+        except (ValueError, ScyllaApiError) as e:
+            return BatchRecord(line_number, line, error=str(e))
+        # parse_invocation() and argparse report problems on stdout/stderr,
+        # capture them into the record instead
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out), redirect_stderr(out):
+                invocation = command.parse_invocation(argv)
+        except SystemExit:
+            invocation = None
+        if invocation is None:
+            return BatchRecord(line_number, line, error=out.getvalue().strip() or "Invalid command")
+        method, args = invocation
+        try:
+            resource_path, query_params = method.build_request(command.name_format, args)
+        except ScyllaApiError as e:
+            return BatchRecord(line_number, line, error=str(e))
+        return method, resource_path, query_params
+
+    def execute(self, line_number:int, line:str, request) -> BatchRecord:
+        if isinstance(request, BatchRecord):
+            return request
+        method, resource_path, query_params = request
+        try:
+            res = self.scylla_api.client.dispatch_rest_method(rest_method_kind=method.kind_to_str[method.kind],
+                                                              path_template=method.path or None,
+                                                              resource_path=resource_path,
+                                                              query_params=query_params)
+        except RequestException as e:
+            return BatchRecord(line_number, line, error=str(e))
+        if res is None:
+            return BatchRecord(line_number, line, error="Connection error")
+        return BatchRecord(line_number, line, status_code=res.status_code, value=decode_response(res))
+
+    def run(self, lines:list, parallel:int=1):
+        """
+        Run the (line_number, line) commands and yield a BatchRecord per line, in order.
+        Lines are parsed up front, and up to parallel requests are in flight at a time.
+        """
+        prepared = [(line_number, line, self.prepare(line_number, line)) for line_number, line in lines]
+        if parallel <= 1:
+            for line_number, line, request in prepared:
+                yield self.execute(line_number, line, request)
+            return
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            # map() returns the records in the order of the lines
+            yield from executor.map(lambda r: self.execute(*r), prepared)
+
+
+def format_record(record:BatchRecord) -> str:
+    return json.dumps(record.to_json())
@@ -5,16 +5,27 @@ Usage::
     ./scylla.py --help [command [args...]]
 """
 
-from re import S
+from __future__ import annotations
+
 from .custom_argparser import ArgumentParser
 import logging
+import os
 import sys
-from pprint import PrettyPrinter
+from typing import TYPE_CHECKING
 
 baselog = logging.getLogger('scylla.cli')
 log = logging.getLogger('scylla.cli.util')
 
-from .api import ScyllaApi, ScyllaApiModule, ScyllaApiCommand, ScyllaApiOption
+from .api import ScyllaApi, ScyllaApiModule, ScyllaApiCommand, MissingArgumentError, CommandNotFoundError
+from .rest import resilience, response_cache
+from .schema_cache import SchemaCache
+from . import completion, exporter, fanout, timing
+from .daemon_client import default_socket_path
+
+# modules needed by some options only are imported where they are used,
+# keeping --help and the argument parsing free of the http client
+if TYPE_CHECKING:
+    from pprint import PrettyPrinter
 
 class Lister:
     def __init__(self, scylla_api:ScyllaApi):
@@ -45,6 +56,7 @@ class Lister:
                 print(f"Error: module '{list_module_commands}' not found")
             return
 
+        self.scylla_api.load_all()
         first = True
         for module_name in self.scylla_api.modules.keys():
             if not first:
@@ -54,17 +66,154 @@ class Lister:
             self.list_module_commands(self.scylla_api.modules[module_name])
 
 # FIXME: better name
-def load_api(node_address:str, port:str) -> ScyllaApi:
-    scylla_api = ScyllaApi(host=node_address, port=port)
-    scylla_api.load()
+def load_api(node_address:str, port:str, schema_cache:SchemaCache=None, refresh_schema:bool=False,
+             timeouts:resilience.Timeouts=None, retry_policy:resilience.RetryPolicy=None) -> ScyllaApi:
+    scylla_api = ScyllaApi(host=node_address, port=port, schema_cache=schema_cache,
+                           timeouts=timeouts, retry_policy=retry_policy)
+    scylla_api.load(refresh_schema=refresh_schema)
     return scylla_api
 
+def run_on_nodes(command:ScyllaApiCommand, nodes:list, port:str, argv:list, output:str='json',
+                 pretty_printer:PrettyPrinter=None, max_concurrency:int=fanout.DEFAULT_MAX_CONCURRENCY):
+    invocation = command.parse_invocation(argv)
+    if invocation is None:
+        return
+    method, args = invocation
+    try:
+        results = fanout.fan_out(method, command.name_format, args, nodes, port, max_concurrency=max_concurrency)
+    except MissingArgumentError as e:
+        print(e)
+        return
+    if output == 'table':
+        print(fanout.format_table(results))
+    else:
+        print(fanout.format_json(results, indent=2 if pretty_printer else None))
+    if not all(result.ok for result in results.items()):
+        exit(1)
+
+
+def run_batch(scylla_api:ScyllaApi, path:str, parallel:int=1) -> bool:
+    """
+    Run the batch commands in path, or stdin if path is '-', printing a json record per command.
+    Returns True if all the commands succeeded.
+    """
+    from . import batch
+    try:
+        if path == '-':
+            lines = batch.read_lines(sys.stdin)
+        else:
+            with open(path, encoding='utf-8') as f:
+                lines = batch.read_lines(f)
+    except OSError as e:
+        print(f"Could not read batch file: {e}")
+        return False
+    ok = True
+    for record in batch.Batch(scylla_api).run(lines, parallel=parallel):
+        print(batch.format_record(record), flush=True)
+        ok = ok and record.ok
+    return ok
+
+
+def resolve_get_requests(scylla_api:ScyllaApi, command_names:list) -> dict:
+    """
+    Resolve the GET requests of the named commands, taking no arguments.
+    Returns a dict mapping each name to its (resource_path, query_params),
+    or None if a command could not be resolved.
+    """
+    requests = dict()
+    for name in command_names:
+        try:
+            command, argv = scylla_api.find_command([name])
+        except CommandNotFoundError as e:
+            print(e)
+            return None
+        method = command.methods.get(ScyllaApiCommand.Method.GET)
+        if method is None:
+            print(f"{name}: GET method is not supported")
+            return None
+        try:
+            requests[name] = method.build_request(command.name_format, {})
+        except MissingArgumentError as e:
+            print(f"{name}: {e}")
+            return None
+    return requests
+
+
+def record(scylla_api:ScyllaApi, path:str, metric_names:list, interval:float, count:int=None) -> bool:
+    """
+    Record the results of the GET commands named in metric_names to path.
+    Returns False if a command could not be resolved or the recording could not be written.
+    """
+    from .recorder import Recorder, RecordingWriter
+    metrics = resolve_get_requests(scylla_api, metric_names)
+    if metrics is None:
+        return False
+    try:
+        with RecordingWriter(path, metrics.keys()) as writer:
+            Recorder(scylla_api.client, metrics, writer).run(interval, count=count)
+    except (OSError, ValueError) as e:
+        print(f"Could not record to {path}: {e}")
+        return False
+    return True
 
-def main():
+
+def export_csv(path:str, start:float=None, end:float=None) -> bool:
+    from .recorder import RecordingReader
+    try:
+        with RecordingReader(path) as reader:
+            reader.to_csv(sys.stdout, start=start, end=end)
+    except (OSError, ValueError) as e:
+        print(f"Could not read recording: {e}")
+        return False
+    return True
+
+
+def run_exporter(scylla_api:ScyllaApi, listen:str, metric_names:list, ttl:float) -> bool:
+    """
+    Serve the results of the GET commands named in metric_names as Prometheus metrics until interrupted.
+    """
+    metrics = resolve_get_requests(scylla_api, metric_names)
+    if metrics is None:
+        return False
+    try:
+        exporter.serve(exporter.Exporter(scylla_api.client, metrics, ttl=ttl), exporter.parse_listen_address(listen))
+    except (OSError, ValueError) as e:
+        print(f"Could not serve metrics on {listen}: {e}")
+        return False
+    return True
+
+
+def timeout_arg(value) -> float:
+    """
+    Parse a timeout in seconds, 0 meaning no timeout.
+    """
+    timeout = float(value)
+    if timeout < 0:
+        raise ValueError(f"Negative timeout '{value}'")
+    return timeout or None
+
+
+def positive_int_arg(value) -> int:
+    """
+    Parse a count of at least 1.
+    """
+    count = int(value)
+    if count < 1:
+        raise ValueError(f"'{value}' is less than 1")
+    return count
+
+
+def create_parser() -> ArgumentParser:
     extra_args_help=f"[module] command [{'|'.join(ScyllaApiCommand.Method.kind_to_str)}] [args...]"
     parser = ArgumentParser(description='Scylla api command line interface.', extra_args_help=extra_args_help)
     parser.add_argument(['-a', '--address'], dest='address', has_param=True,
-                        help=f"IP address of server node (default: {ScyllaApi.DEFAULT_HOST})")
+                        help=f"IP address of server node, or a comma separated list of nodes to run the command on (default: {ScyllaApi.DEFAULT_HOST})")
+    parser.add_argument(['-af', '--address-file'], dest='address_file', has_param=True,
+                        help=f"File listing the nodes to run the command on, one per line")
+    parser.add_argument(['-j', '--max-concurrency'], dest='max_concurrency', has_param=True,
+                        help=f"Maximum number of nodes to run the command on concurrently (default: {fanout.DEFAULT_MAX_CONCURRENCY})")
+    parser.add_argument(['-o', '--output'], dest='output', has_param=True,
+                        help=f"Output the results keyed per node as json|table")
     parser.add_argument(['-p', '--port'], dest='port', has_param=True,
                         help=f"api port (default: {ScyllaApi.DEFAULT_PORT})")
 
@@ -73,14 +222,92 @@ def main():
     parser.add_argument(['-pp-opts', '--pretty-print-options'], dest='pprint_options', has_param=True,
                         help=f"pretty print options as width[:indent] (default: 200:1)")
 
+    parser.add_argument(['-js', '--json-stream'], dest='json_stream',
+                        help=f"Print the elements of a json array result one per line, as they arrive")
+    parser.add_argument(['--output-file'], dest='output_file', has_param=True,
+                        help=f"Write the raw result to a file")
+
+    parser.add_argument(['-w', '--watch'], dest='watch', has_param=True,
+                        help=f"Repeat the command every WATCH seconds, printing the change and rate of numeric results")
+    parser.add_argument(['--watch-count'], dest='watch_count', has_param=True,
+                        help=f"Number of times to repeat the command in watch mode (default: until interrupted)")
+
+    parser.add_argument(['--record'], dest='record', has_param=True,
+                        help=f"Record the numeric results of the given GET commands, every --record-interval seconds, to a file")
+    parser.add_argument(['--record-interval'], dest='record_interval', has_param=True,
+                        help=f"Seconds between recorded samples (default: 5)")
+    parser.add_argument(['--record-count'], dest='record_count', has_param=True,
+                        help=f"Number of samples to record (default: until interrupted)")
+    parser.add_argument(['--export-csv'], dest='export_csv', has_param=True,
+                        help=f"Print a recording as csv, limited to --export-start and --export-end, in seconds since the epoch")
+    parser.add_argument(['--export-start'], dest='export_start', has_param=True,
+                        help=f"Export the samples recorded at or after this time")
+    parser.add_argument(['--export-end'], dest='export_end', has_param=True,
+                        help=f"Export the samples recorded at or before this time")
+
+    parser.add_argument(['--exporter'], dest='exporter', has_param=True,
+                        help=f"Serve the results of the given GET commands as Prometheus metrics on [HOST:]PORT/metrics")
+    parser.add_argument(['--exporter-ttl'], dest='exporter_ttl', has_param=True,
+                        help=f"Seconds to cache the exported results for, shared by all scrapers (default: {exporter.DEFAULT_TTL})")
+
+    parser.add_argument(['-b', '--batch'], dest='batch', has_param=True, default_param='-',
+                        help=f"Run the commands listed in a file, one per line, or read from stdin if no file or '-' is given")
+    parser.add_argument(['--parallel'], dest='parallel', has_param=True,
+                        help=f"Number of batch commands to run in parallel (default: 1)")
+
+    parser.add_argument(['-i', '--interactive'], dest='interactive',
+                        help=f"Run an interactive shell")
+
     parser.add_argument(['-l', '--list'], dest='list_api', help=f"List all API commands")
     parser.add_argument(['-lm', '--list-modules'], dest='list_modules', help=f"List all API modules")
     parser.add_argument(['-lmc', '--list-module-commands'], dest='list_module_commands', has_param=True,
                         help=f"List all commands in an API module")
 
+    parser.add_argument(['--connect-timeout'], dest='connect_timeout', has_param=True,
+                        help=f"Seconds to wait for connecting to a node (default: {resilience.DEFAULT_CONNECT_TIMEOUT})")
+    parser.add_argument(['--read-timeout'], dest='read_timeout', has_param=True,
+                        help=f"Seconds to wait for a GET response, 0 to wait forever (default: {resilience.DEFAULT_READ_TIMEOUT})")
+    parser.add_argument(['--write-timeout'], dest='write_timeout', has_param=True,
+                        help=f"Seconds to wait for a POST or DELETE response (default: wait forever)")
+    parser.add_argument(['--retries'], dest='retries', has_param=True,
+                        help=f"Number of times to retry a failed GET request, with jittered exponential backoff (default: {resilience.DEFAULT_RETRIES})")
+
+    parser.add_argument(['--response-cache-ttl'], dest='response_cache_ttl', has_param=True,
+                        help=f"Cache GET responses for a comma separated list of [PATH=]SECONDS ttls, the ttl without a path being the default, e.g. 5,/storage_service/host_id=60")
+    parser.add_argument(['--response-cache-size'], dest='response_cache_size', has_param=True,
+                        help=f"Maximum number of cached GET responses (default: {response_cache.DEFAULT_MAX_ENTRIES})")
+
+    parser.add_argument(['--refresh-schema'], dest='refresh_schema',
+                        help=f"Refetch the api schema from the node and update the schema cache")
+    parser.add_argument(['--no-schema-cache'], dest='no_schema_cache',
+                        help=f"Do not use the on-disk schema cache")
+    parser.add_argument(['--schema-cache-dir'], dest='schema_cache_dir', has_param=True,
+                        help=f"Schema cache directory (default: {SchemaCache.default_dir()})")
+
+    parser.add_argument(['--daemon'], dest='daemon',
+                        help=f"Run a daemon keeping the loaded api of each node, to which later invocations are forwarded")
+    parser.add_argument(['--socket'], dest='socket', has_param=True,
+                        help=f"Daemon socket path (default: {default_socket_path()})")
+    parser.add_argument(['--no-daemon'], dest='no_daemon',
+                        help=f"Run in-process even when a daemon is running")
+
+    parser.add_argument(['--completion'], dest='completion', has_param=True,
+                        help=f"Print a bash|zsh|fish completion script for the loaded api, completing names offline")
+
+    parser.add_argument(['--timing'], dest='timing',
+                        help=f"Print the time spent in each phase and the request latencies to stderr")
+
     parser.add_argument(['-d', '--debug'], dest='debug', help=f"Turn on debug logging (default=False)")
+    return parser
+
 
-    parser.parse_args()
+def main(argv:list=None, api_loader=load_api):
+    # phases are timed per invocation, while the latency histograms accumulate in a daemon
+    timing.reset()
+    timing.record_startup()
+    with timing.phase('parse arguments'):
+        parser = create_parser()
+        parser.parse_args([sys.argv[0]] + argv if argv is not None else None)
 
     if not parser.args and not parser.extra_args:
         parser.usage()
@@ -90,70 +317,86 @@ def main():
 
     log.debug('Starting')
 
-    node_address = parser.get('address', ScyllaApi.DEFAULT_HOST)
-    port = parser.get('port', ScyllaApi.DEFAULT_PORT)
-    scylla_api = load_api(node_address=node_address, port=port)
+    if not parser.get('timing'):
+        run(parser, api_loader)
+        return
+    try:
+        run(parser, api_loader)
+    finally:
+        print(timing.format_report(), file=sys.stderr)
 
-    # FIXME: load only needed module(s)
 
-    lister = Lister(scylla_api)
-    if parser.get('list_api') or parser.get('list_modules') or parser.get('list_module_commands'):
-        lister.list_api(parser.get('list_modules'), parser.get('list_module_commands'))
+def run(parser:ArgumentParser, api_loader=load_api):
+    if parser.get('daemon'):
+        # the daemon module builds on this one
+        from .daemon import serve
+        serve(parser.get('socket'))
         exit()
 
-    if not parser.extra_args:
-        parser.usage(do_exit=False)
-        lister.list_modules()
-        exit()
+    if parser.get('export_csv'):
+        try:
+            start = float(parser.get('export_start')) if parser.get('export_start') else None
+            end = float(parser.get('export_end')) if parser.get('export_end') else None
+        except ValueError as e:
+            print(f"Invalid export option: {e}")
+            exit(1)
+        exit(0 if export_csv(parser.get('export_csv'), start=start, end=end) else 1)
 
-    argv = parser.extra_args
-    if argv[0].strip(' /') in scylla_api.modules.keys():
-        module_name = argv[0].strip(' /')
-        argv = argv[1:]
-        module = scylla_api.modules[module_name]
-        if not argv or argv[0] in ['-h', '--help']:
-            lister.list_module_commands(module)
-            exit()
-        command_name = argv[0].strip(' /')
-        argv = argv[1:]
+    nodes = fanout.parse_nodes(parser.get('address', ''))
+    if parser.get('address_file'):
         try:
-            command = module.commands[command_name]
-        except KeyError:
-            print(f"Could not find command '{command_name}' in module '{module_name}'")
+            nodes += fanout.read_nodes_file(parser.get('address_file'))
+        except OSError as e:
+            print(f"Could not read address file: {e}")
             exit(1)
+    nodes = nodes or [ScyllaApi.DEFAULT_HOST]
+    output = parser.get('output')
+    if output not in [None, 'json', 'table']:
+        print(f"Unsupported output format '{output}'. Use one of json|table.")
+        exit(1)
+    try:
+        max_concurrency = positive_int_arg(parser.get('max_concurrency', fanout.DEFAULT_MAX_CONCURRENCY))
+    except ValueError as e:
+        print(f"Invalid max concurrency option: {e}")
+        exit(1)
+    try:
+        parallel = positive_int_arg(parser.get('parallel', 1))
+    except ValueError as e:
+        print(f"Invalid parallel option: {e}")
+        exit(1)
+    # the schema is loaded once, from the first node, and used for all nodes
+    node_address = nodes[0]
+    port = parser.get('port', ScyllaApi.DEFAULT_PORT)
+    schema_cache = None if parser.get('no_schema_cache') else SchemaCache(parser.get('schema_cache_dir'))
+    # the timeouts and retries apply to the schema fetches too
+    try:
+        timeouts = resilience.Timeouts(
+            connect=timeout_arg(parser.get('connect_timeout', resilience.DEFAULT_CONNECT_TIMEOUT)),
+            read=timeout_arg(parser.get('read_timeout', resilience.DEFAULT_READ_TIMEOUT)),
+            write_read=timeout_arg(parser.get('write_timeout', 0)))
+        retry_policy = resilience.RetryPolicy(retries=int(parser.get('retries', resilience.DEFAULT_RETRIES)))
+    except ValueError as e:
+        print(f"Invalid timeout or retries option: {e}")
+        exit(1)
+    with timing.phase('load api'):
+        scylla_api = api_loader(node_address=node_address, port=port, schema_cache=schema_cache,
+                                refresh_schema=parser.get('refresh_schema', False),
+                                timeouts=timeouts, retry_policy=retry_policy)
+
+    if parser.get('response_cache_ttl'):
+        try:
+            default_ttl, ttls = response_cache.parse_ttls(parser.get('response_cache_ttl'))
+            max_entries = int(parser.get('response_cache_size', response_cache.DEFAULT_MAX_ENTRIES))
+        except ValueError as e:
+            print(f"Invalid response cache option: {e}")
+            exit(1)
+        cache = scylla_api.client.response_cache
+        # a daemon keeps the cache of the node api between invocations with the same settings
+        if cache is None or (cache.default_ttl, cache.ttls, cache.max_entries) != (default_ttl, ttls, max_entries):
+            scylla_api.client.response_cache = response_cache.ResponseCache(default_ttl=default_ttl, ttls=ttls,
+                                                                            max_entries=max_entries)
     else:
-        command_name = argv[0].strip(' /')
-        argv = argv[1:]
-        sep = command_name.find('/')
-        if sep > 0:
-            module_name = command_name[:sep]
-            command_name = command_name[sep+1:]
-            try:
-                module = scylla_api.modules[module_name]
-            except KeyError:
-                print(f"Could not find module '{module_name}'")
-                exit(1)
-            try:
-                command = module.commands[command_name]
-            except KeyError:
-                print(f"Could not find command '{command_name}' in module '{module_name}'")
-                exit(1)
-        else:
-            module = None
-            command = None
-            for m in scylla_api.modules.items():
-                try:
-                    command = m.commands[command_name]
-                    if not module:
-                        module = m
-                    else:
-                        print(f"Command '{command_name}' exists in multiple modules. Specify 'module/command' to uniquely identify the command.")
-                        exit(1)
-                except KeyError:
-                    pass
-            if not command:
-                print(f"Could not find command '{command_name}'")
-                exit(1)
+        scylla_api.client.response_cache = None
 
     pretty_printer = None
     pprint_opts = parser.get('pprint_options', '')
@@ -168,9 +411,98 @@ def main():
                 indent = int(opts[1])
             except IndexError:
                 pass
+        from pprint import PrettyPrinter
         pretty_printer = PrettyPrinter(width=width, indent=indent)
-    command.invoke(node_address=node_address, port=port, argv=argv, pretty_printer=pretty_printer)
 
+    lister = Lister(scylla_api)
+    if parser.get('list_api') or parser.get('list_modules') or parser.get('list_module_commands'):
+        lister.list_api(parser.get('list_modules'), parser.get('list_module_commands'))
+        exit()
+
+    if parser.get('completion'):
+        index_path = os.path.join(schema_cache.cache_dir if schema_cache else SchemaCache.default_dir(), 'completion.json')
+        try:
+            print(completion.generate(scylla_api, create_parser(), parser.get('completion'), index_path))
+        except (ValueError, OSError) as e:
+            print(f"Could not generate completion: {e}")
+            exit(1)
+        exit()
+
+    if parser.get('interactive'):
+        # the shell module builds on this one
+        from .shell import ApiShell
+        ApiShell(scylla_api, schema_cache=schema_cache, pretty_printer=pretty_printer).cmdloop()
+        exit()
+
+    if parser.get('record'):
+        try:
+            interval = float(parser.get('record_interval', 5))
+            count = int(parser.get('record_count')) if parser.get('record_count') else None
+        except ValueError as e:
+            print(f"Invalid record option: {e}")
+            exit(1)
+        if interval <= 0 or not parser.extra_args:
+            print("Recording requires a positive interval and at least one GET command")
+            exit(1)
+        exit(0 if record(scylla_api, parser.get('record'), parser.extra_args, interval, count=count) else 1)
+
+    if parser.get('exporter'):
+        try:
+            ttl = float(parser.get('exporter_ttl', exporter.DEFAULT_TTL))
+        except ValueError as e:
+            print(f"Invalid exporter option: {e}")
+            exit(1)
+        if not parser.extra_args:
+            print("The exporter requires at least one GET command")
+            exit(1)
+        exit(0 if run_exporter(scylla_api, parser.get('exporter'), parser.extra_args, ttl) else 1)
+
+    if parser.get('batch'):
+        ok = run_batch(scylla_api, parser.get('batch'), parallel=parallel)
+        exit(0 if ok else 1)
+
+    if not parser.extra_args:
+        parser.usage(do_exit=False)
+        lister.list_modules()
+        exit()
+
+    argv = parser.extra_args
+    if argv[0].strip(' /') in scylla_api.modules and (len(argv) == 1 or argv[1] in ['-h', '--help']):
+        lister.list_module_commands(scylla_api.modules[argv[0].strip(' /')])
+        exit()
+    try:
+        command, argv = scylla_api.find_command(argv)
+    except CommandNotFoundError as e:
+        print(e)
+        exit(1)
+
+    if len(nodes) > 1 or output:
+        run_on_nodes(command, nodes, port, argv, output=output or 'json', pretty_printer=pretty_printer,
+                     max_concurrency=max_concurrency)
+    elif parser.get('output_file'):
+        try:
+            with open(parser.get('output_file'), 'wb') as out:
+                command.invoke(node_address=node_address, port=port, argv=argv, out=out)
+        except OSError as e:
+            print(f"Could not write output file: {e}")
+            exit(1)
+    elif parser.get('watch'):
+        try:
+            watch = float(parser.get('watch'))
+            watch_count = int(parser.get('watch_count')) if parser.get('watch_count') else None
+        except ValueError as e:
+            print(f"Invalid watch option: {e}")
+            exit(1)
+        if watch <= 0:
+            print("The watch interval must be positive")
+            exit(1)
+        command.invoke(node_address=node_address, port=port, argv=argv, watch=watch, watch_count=watch_count)
+    else:
+        command.invoke(node_address=node_address, port=port, argv=argv, pretty_printer=pretty_printer,
+                       json_stream=parser.get('json_stream', False))
+
+    if scylla_api.client.response_cache is not None:
+        log.debug(f"Response cache: {scylla_api.client.response_cache.stats()}")
     log.debug('done')
     logging.shutdown()
 
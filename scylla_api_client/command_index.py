@@ -0,0 +1,72 @@
+"""
+Index of the api commands of all modules, by command name
+"""
+
+import difflib
+
+# trie node key holding the names ending at the node
+_NAMES = ''
+
+
+class CommandIndex:
+    """
+    Maps each command name to the commands of that name in all modules,
+    and keeps a prefix trie of the command names and 'module/command' paths
+    for completing partial names.
+    """
+    def __init__(self):
+        self._commands = dict()
+        self._trie = dict()
+
+    def __len__(self):
+        return len(self._commands)
+
+    def add(self, module_name:str, command):
+        self._commands.setdefault(command.name, []).append(command)
+        self._insert(command.name)
+        self._insert(f"{module_name}/{command.name}")
+
+    def _insert(self, name:str):
+        node = self._trie
+        for c in name:
+            node = node.setdefault(c, dict())
+        names = node.setdefault(_NAMES, [])
+        if name not in names:
+            names.append(name)
+
+    def lookup(self, command_name:str) -> list:
+        """
+        Return the commands named command_name in all modules.
+        """
+        return self._commands.get(command_name, [])
+
+    def complete(self, prefix:str, limit:int=None) -> list:
+        """
+        Return the command names and 'module/command' paths starting with prefix, sorted.
+        """
+        node = self._trie
+        for c in prefix:
+            node = node.get(c)
+            if node is None:
+                return []
+        names = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == _NAMES:
+                    names.extend(child)
+                else:
+                    stack.append(child)
+        names.sort()
+        return names[:limit] if limit else names
+
+    def suggest(self, name:str, limit:int=3) -> list:
+        """
+        Return the names closest to a name that was not found: its completions
+        if it is a prefix of known names, otherwise the most similar names.
+        """
+        names = self.complete(name, limit=limit)
+        if names:
+            return names
+        return difflib.get_close_matches(name, self._commands.keys(), n=limit)
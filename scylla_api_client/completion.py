@@ -0,0 +1,178 @@
+"""
+Offline shell completion of api module, command, method and option names.
+The completion index is generated from a loaded api, and looked up by the
+generated shell scripts without contacting the node. Only the standard
+library is imported here, to keep the lookups fast.
+"""
+
+import json
+import os
+import tempfile
+
+# bump when the layout of the index changes
+FORMAT = 1
+
+SHELLS = ['bash', 'zsh', 'fish']
+
+BASH_SCRIPT = """\
+_scylla_api_client()
+{
+    local cur="${COMP_WORDS[COMP_CWORD]}"
+    local IFS=$'\\n'
+    COMPREPLY=( $(%(prog)s --complete %(index)s "${COMP_WORDS[@]:1:COMP_CWORD-1}" "$cur" 2>/dev/null) )
+}
+complete -o default -F _scylla_api_client %(prog)s
+"""
+
+ZSH_SCRIPT = """\
+#compdef %(prog)s
+_scylla_api_client()
+{
+    local -a candidates
+    candidates=(${(f)"$(%(prog)s --complete %(index)s "${(@)words[2,CURRENT-1]}" "${words[CURRENT]}" 2>/dev/null)"})
+    compadd -a candidates
+}
+compdef _scylla_api_client %(prog)s
+"""
+
+FISH_SCRIPT = """\
+function __scylla_api_client_complete
+    set -l tokens (commandline -opc)
+    %(prog)s --complete %(index)s $tokens[2..-1] (commandline -ct) 2>/dev/null
+end
+complete -c %(prog)s -f -a '(__scylla_api_client_complete)'
+"""
+
+SCRIPTS = {'bash': BASH_SCRIPT, 'zsh': ZSH_SCRIPT, 'fish': FISH_SCRIPT}
+
+
+def build_index(scylla_api, parser) -> dict:
+    """
+    Build the completion index of all the api modules and of the cli options:
+    {"format": ..., "options": {option: has_param}, "modules": {module: {command: {METHOD: {option: [values]}}}}}
+    """
+    scylla_api.load_all()
+    modules = dict()
+    for module_name in scylla_api.modules.keys():
+        module = scylla_api.modules[module_name]
+        commands = dict()
+        for command_name in module.commands.keys():
+            command = module.commands[command_name]
+            methods = dict()
+            for kind, method in command.methods.items():
+                methods[method.kind_to_str[kind]] = {opt.name: list(opt.allowed_values) for opt in method.options.items()}
+            commands[command_name] = methods
+        modules[module_name] = commands
+    options = dict()
+    for arg in parser._raw_args.items():
+        for name in arg.names:
+            options[name] = arg.has_param
+    return {'format': FORMAT, 'options': options, 'modules': modules}
+
+
+def write_index(index:dict, path:str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # write to a temporary file first so lookups never see a partial index
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.completion-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def generate(scylla_api, parser, shell:str, index_path:str, prog:str='scylla-api-client') -> str:
+    """
+    Write the completion index of the loaded api to index_path and return
+    the completion script for shell.
+    Raises ValueError for an unsupported shell.
+    """
+    if shell not in SCRIPTS:
+        raise ValueError(f"Unsupported shell '{shell}'. Use one of {'|'.join(SHELLS)}.")
+    if not len(scylla_api.modules):
+        raise ValueError("The api is not loaded")
+    write_index(build_index(scylla_api, parser), index_path)
+    return SCRIPTS[shell] % {'prog': prog, 'index': _quote(index_path)}
+
+
+def _quote(s:str) -> str:
+    return "'" + s.replace("'", "'\\''") + "'"
+
+
+def complete(index:dict, words:list, cur:str) -> list:
+    """
+    Return the candidates for the word being completed, cur, given the
+    preceding command line words.
+    """
+    options = index['options']
+    modules = index['modules']
+    i = 0
+    # skip the cli options and their parameters
+    while i < len(words) and words[i].startswith('-'):
+        word = words[i]
+        i += 1
+        if options.get(word) and i < len(words) and not words[i].startswith('-'):
+            i += 1
+    words = words[i:]
+
+    if not words:
+        if cur.startswith('-'):
+            return sorted(name for name in options if name.startswith(cur))
+        if '/' in cur:
+            module_name, _, prefix = cur.partition('/')
+            return [f"{module_name}/{name}" for name in modules.get(module_name, {}) if name.startswith(prefix)]
+        return [name for name in modules if name.startswith(cur)]
+
+    name = words[0].strip(' /')
+    if name in modules:
+        if len(words) == 1:
+            return [command for command in modules[name] if command.startswith(cur)]
+        methods = modules[name].get(words[1].strip(' /'))
+        args = words[2:]
+    else:
+        module_name, _, command_name = name.partition('/')
+        methods = modules.get(module_name, {}).get(command_name)
+        args = words[1:]
+    if methods is None:
+        return []
+
+    if args and args[0] in methods:
+        method_options = [methods[args[0]]]
+        args = args[1:]
+    else:
+        if not args and not cur.startswith('-'):
+            return [kind for kind in methods if kind.startswith(cur.upper())]
+        method_options = list(methods.values())
+    if args and args[-1].startswith('--'):
+        for opts in method_options:
+            values = opts.get(args[-1][2:])
+            if values:
+                return [value for value in values if value.startswith(cur)]
+    candidates = []
+    for opts in method_options:
+        for opt_name in opts:
+            opt = f"--{opt_name}"
+            if opt.startswith(cur) and opt not in candidates and opt not in args:
+                candidates.append(opt)
+    return candidates
+
+
+def complete_main(argv:list) -> int:
+    """
+    Entry point of the completion lookups: argv is the index path, the
+    preceding command line words and the word being completed.
+    """
+    if len(argv) < 2:
+        return 1
+    try:
+        with open(argv[0], encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return 1
+    if index.get('format') != FORMAT:
+        return 1
+    for candidate in complete(index, argv[1:-1], argv[-1]):
+        print(candidate)
+    return 0
@@ -0,0 +1,132 @@
+"""
+Resident scylla-api-client daemon.
+Keeps a loaded ScyllaApi, and its pooled connections, per node and runs
+the command lines forwarded by the thin client over a local UNIX socket.
+"""
+
+import io
+import json
+import logging
+import os
+import signal
+import socketserver
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from threading import Lock
+
+from .api import ScyllaApi
+from .cli import load_api, main
+from .daemon_client import default_socket_path, send_request
+from .rest.resilience import RetryPolicy, Timeouts
+from .schema_cache import SchemaCache
+
+log = logging.getLogger('scylla.cli.daemon')
+
+
+class ApiCache:
+    """
+    Loaded ScyllaApi objects by node, reused by all the daemon requests.
+    """
+    def __init__(self):
+        self._apis = dict()
+        self._lock = Lock()
+
+    def load_api(self, node_address:str, port:str, schema_cache:SchemaCache=None, refresh_schema:bool=False,
+                 timeouts:Timeouts=None, retry_policy:RetryPolicy=None) -> ScyllaApi:
+        key = (node_address, str(port))
+        with self._lock:
+            scylla_api = self._apis.get(key)
+            if scylla_api is None or refresh_schema or not len(scylla_api.modules):
+                log.debug(f"Loading api of {node_address}:{port}")
+                scylla_api = load_api(node_address, port, schema_cache=schema_cache, refresh_schema=refresh_schema,
+                                      timeouts=timeouts, retry_policy=retry_policy)
+                self._apis[key] = scylla_api
+            else:
+                # the timeouts and retries are per invocation
+                scylla_api.client.timeouts = timeouts or Timeouts()
+                scylla_api.client.retry_policy = retry_policy or RetryPolicy()
+            return scylla_api
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            log.error(f"Invalid request: {e}")
+            return
+        if request.get('ping'):
+            response = {'exit': 0}
+        else:
+            response = self.server.run(request)
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class Daemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path:str=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.api_cache = ApiCache()
+        # the cli writes to the process stdout, so commands run one at a time
+        self._run_lock = Lock()
+        if os.path.exists(self.socket_path):
+            if send_request({'ping': True}, self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        # only the user running the daemon may connect to it
+        umask = os.umask(0o077)
+        try:
+            super().__init__(self.socket_path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def run(self, request:dict) -> dict:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        exit_code = 0
+        with self._run_lock:
+            saved_cwd = os.getcwd()
+            saved_stdin = sys.stdin
+            try:
+                if request.get('cwd'):
+                    os.chdir(request['cwd'])
+                if 'stdin' in request:
+                    sys.stdin = io.StringIO(request['stdin'])
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    main(request.get('argv', []), api_loader=self.api_cache.load_api)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    stderr.write(f"{e.code}\n")
+            except Exception as e:
+                log.exception(f"Failed to run {request.get('argv')}")
+                stderr.write(f"{e}\n")
+                exit_code = 1
+            finally:
+                sys.stdin = saved_stdin
+                os.chdir(saved_cwd)
+        return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'exit': exit_code}
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(socket_path:str=None):
+    # configure logging up front, so the handler is not bound to a request's captured stderr
+    logging.basicConfig(format='%(asctime)s,%(msecs)03d %(process)-7d %(name)-25s %(levelname)-8s | %(message)s')
+    with Daemon(socket_path) as daemon:
+        log.info(f"Listening on {daemon.socket_path}")
+        # exit cleanly on SIGTERM, so the socket is removed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,122 @@
+"""
+Thin client forwarding command lines to a running scylla-api-client daemon.
+Only the standard library is imported here, to keep the client startup fast.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+
+SOCKET_ENV = 'SCYLLA_API_CLIENT_SOCKET'
+
+# options that must run in the client process: the daemon runs one command at a time
+# and returns its output when it completes, so commands that run until interrupted stay local
+LOCAL_OPTIONS = ['-i', '--interactive', '--daemon', '--no-daemon', '-w', '--watch', '--record',
+                 '--exporter']
+BATCH_OPTIONS = ['-b', '--batch']
+
+
+def default_socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'scylla-api-client.sock')
+    return os.path.join(tempfile.gettempdir(), f"scylla-api-client-{os.getuid()}.sock")
+
+
+def send_request(request:dict, socket_path:str=None):
+    """
+    Send a request to the daemon and return its response,
+    or None if no daemon is listening on socket_path.
+    The socket must be owned by the user and not writable by others,
+    otherwise another user could run a daemon answering our commands.
+    """
+    socket_path = socket_path or default_socket_path()
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            with sock.makefile('rwb') as f:
+                f.write(json.dumps(request).encode('utf-8') + b'\n')
+                f.flush()
+                line = f.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def socket_path_arg(argv:list):
+    for i, arg in enumerate(argv):
+        if arg.startswith('--socket='):
+            return arg[len('--socket='):]
+        if arg == '--socket' and i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
+def reads_stdin(argv:list) -> bool:
+    """
+    Whether argv runs a batch read from stdin: --batch without a file, or with '-'.
+    """
+    for i, arg in enumerate(argv):
+        opt, eq, param = arg.partition('=')
+        if opt not in BATCH_OPTIONS:
+            continue
+        if not eq:
+            # like the cli parser, a following option is not taken as the batch file
+            param = argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith('-') else '-'
+        if param == '-':
+            return True
+    return False
+
+
+def forward(argv:list, socket_path:str=None):
+    """
+    Run argv on the daemon and print its output.
+    Returns the command exit code, or None if argv must run in-process.
+    """
+    if any(arg.partition('=')[0] in LOCAL_OPTIONS for arg in argv):
+        return None
+    socket_path = socket_path or socket_path_arg(argv)
+    request = {'argv': argv, 'cwd': os.getcwd()}
+    if reads_stdin(argv) and not sys.stdin.isatty():
+        # stdin is only consumed once a daemon is known to run the batch
+        if send_request({'ping': True}, socket_path) is None:
+            return None
+        request['stdin'] = sys.stdin.read()
+    response = send_request(request, socket_path)
+    if response is None:
+        if 'stdin' in request:
+            # stdin was consumed, let the in-process run read it
+            sys.stdin = _StringStdin(request['stdin'])
+        return None
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    sys.stdout.flush()
+    return response.get('exit', 0)
+
+
+class _StringStdin:
+    def __init__(self, text:str):
+        self._lines = text.splitlines(keepends=True)
+
+    def __iter__(self):
+        return iter(self._lines)
+
+    def read(self) -> str:
+        return ''.join(self._lines)
+
+    def isatty(self) -> bool:
+        return False
@@ -0,0 +1,139 @@
+"""
+Prometheus exposition of api GET results.
+Serves /metrics in the Prometheus text format, built from the results of
+a set of GET commands. The results are cached for a ttl, and concurrent
+scrapes of an expired cache wait for a single refresh, so any number of
+scrapers cost the node one set of requests per ttl.
+"""
+
+import logging
+import re
+import signal
+import sys
+import threading
+import time
+from threading import Lock
+
+log = logging.getLogger('scylla.api.exporter')
+
+DEFAULT_TTL = 10.0
+PREFIX = 'scylla_api'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def metric_name(command_path:str) -> str:
+    """
+    The Prometheus metric name of a 'module/command' path, e.g. scylla_api_storage_service_load
+    """
+    return f"{PREFIX}_{_INVALID_NAME_CHARS.sub('_', command_path.strip('/'))}"
+
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def samples(value) -> list:
+    """
+    Return the (labels, number) samples of a json result: a number, a list
+    of numbers, labelled by index, or a list of {"key": ..., "value": ...}
+    maps, labelled by key. Other results have no samples.
+    """
+    if _is_number(value):
+        return [('', value)]
+    if not isinstance(value, list):
+        return []
+    result = []
+    for i, item in enumerate(value):
+        if _is_number(item):
+            result.append((f'index="{i}"', item))
+        elif isinstance(item, dict) and _is_number(item.get('value')) and 'key' in item:
+            result.append((f'key="{_label_value(item["key"])}"', item['value']))
+    return result
+
+
+class Exporter:
+    """
+    Renders the results of the metrics GET requests, a dict mapping each
+    'module/command' path to its (resource_path, query_params), with a
+    ScyllaRestClient.
+    """
+    def __init__(self, rest_client, metrics:dict, ttl:float=DEFAULT_TTL):
+        self.rest_client = rest_client
+        self.metrics = metrics
+        self.ttl = ttl
+        self.refreshes = 0
+        self._lock = Lock()
+        self._body = None
+        self._expires = 0.0
+
+    def fetch(self, resource_path:str, query_params:dict):
+        from requests.exceptions import RequestException
+        try:
+            res = self.rest_client.get(resource_path, query_params=query_params)
+        except RequestException as e:
+            log.debug(f"{resource_path}: {e}")
+            return None
+        if res is None or res.status_code != 200:
+            return None
+        try:
+            return res.json()
+        except ValueError:
+            return None
+
+    def collect(self) -> str:
+        lines = [f"# HELP {PREFIX}_request_success Whether the last request of a command succeeded",
+                 f"# TYPE {PREFIX}_request_success gauge"]
+        metric_lines = []
+        for command_path, (resource_path, query_params) in self.metrics.items():
+            value = self.fetch(resource_path, query_params)
+            lines.append(f'{PREFIX}_request_success{{command="{_label_value(command_path)}"}} {int(value is not None)}')
+            command_samples = samples(value) if value is not None else []
+            if not command_samples:
+                continue
+            name = metric_name(command_path)
+            metric_lines.append(f"# HELP {name} GET {resource_path}")
+            metric_lines.append(f"# TYPE {name} gauge")
+            for labels, number in command_samples:
+                metric_lines.append(f"{name}{{{labels}}} {float(number)!r}" if labels else f"{name} {float(number)!r}")
+        return '\n'.join(lines + metric_lines) + '\n'
+
+    def render(self) -> str:
+        """
+        Return the exposition text, refreshing it if it is older than the ttl.
+        Scrapes arriving during a refresh wait for it rather than issuing their own requests.
+        """
+        with self._lock:
+            if self._body is None or time.monotonic() >= self._expires:
+                self._body = self.collect()
+                self._expires = time.monotonic() + self.ttl
+                self.refreshes += 1
+            return self._body
+
+
+def parse_listen_address(listen:str) -> tuple:
+    """
+    Parse a [host:]port listen address, listening on all interfaces by default.
+    Raises ValueError for an invalid port.
+    """
+    host, _, port = listen.rpartition(':')
+    return host, int(port)
+
+
+def serve(exporter:Exporter, address:tuple):
+    # the http server is only needed when serving
+    from .exporter_server import ExporterServer
+    with ExporterServer(address, exporter) as server:
+        log.info(f"Serving metrics on {server.server_address[0]}:{server.server_address[1]}/metrics")
+        # signal handlers can only be installed by the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,36 @@
+"""
+HTTP server of the Prometheus exporter, serving /metrics.
+"""
+
+import logging
+import socketserver
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .exporter import CONTENT_TYPE, Exporter
+
+log = logging.getLogger('scylla.api.exporter')
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+
+class ExporterServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address:tuple, exporter:Exporter):
+        self.exporter = exporter
+        super().__init__(address, RequestHandler)
@@ -0,0 +1,113 @@
+"""
+Run an api method on multiple Scylla nodes
+"""
+
+import json
+import logging
+
+from .api import OrderedDict, ScyllaApiCommand, decode_response
+
+log = logging.getLogger('scylla.api.fanout')
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class NodeResult:
+    """
+    The outcome of running a method on a single node.
+    Either status_code and value are set, or error is.
+    """
+    def __init__(self, node:str, status_code:int=None, value=None, error:str=None):
+        self.node = node
+        self.status_code = status_code
+        self.value = value
+        self.error = error
+
+    def __repr__(self):
+        return f"NodeResult(node={self.node}, status_code={self.status_code}, value={self.value}, error={self.error})"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code == 200
+
+    def to_json(self):
+        if self.error is not None:
+            return {"error": self.error}
+        if self.status_code != 200:
+            return {"status": self.status_code, "error": self.value}
+        return self.value
+
+
+def read_nodes_file(path:str) -> list:
+    """
+    Read node addresses from a file, one per line.
+    Blank lines and lines starting with '#' are ignored.
+    """
+    nodes = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                nodes.append(line)
+    return nodes
+
+
+def parse_nodes(addresses:str) -> list:
+    """
+    Split a comma or whitespace separated list of node addresses.
+    """
+    return [node for node in addresses.replace(',', ' ').split() if node]
+
+
+def run_on_node(method:ScyllaApiCommand.Method, resource_path:str, query_params:dict, node:str, port) -> NodeResult:
+    from requests.exceptions import RequestException
+    from .rest.scylla_rest_client import ScyllaRestClient
+    # the nodes are queried with the timeouts and retries of the api client
+    client = ScyllaRestClient(host=node, port=port, timeouts=method.rest_client.timeouts,
+                              retry_policy=method.rest_client.retry_policy)
+    try:
+        res = client.dispatch_rest_method(rest_method_kind=method.kind_to_str[method.kind],
+                                          path_template=method.path or None,
+                                          resource_path=resource_path,
+                                          query_params=query_params)
+    except RequestException as e:
+        log.debug(f"{node}: {e}")
+        return NodeResult(node, error=str(e))
+    if res is None:
+        return NodeResult(node, error="Connection error")
+    return NodeResult(node, status_code=res.status_code, value=decode_response(res))
+
+
+def fan_out(method:ScyllaApiCommand.Method, path_format:str, args:dict, nodes:list, port,
+            max_concurrency:int=DEFAULT_MAX_CONCURRENCY) -> OrderedDict:
+    """
+    Run method on all nodes concurrently, using up to max_concurrency threads.
+    The request is built once from args and sent to every node.
+    Returns an OrderedDict of NodeResult keyed by node, in the order of nodes.
+    Raises MissingArgumentError when a path argument is missing.
+    """
+    resource_path, query_params = method.build_request(path_format, args)
+    results = OrderedDict()
+    nodes = list(dict.fromkeys(nodes))
+    if not nodes:
+        return results
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(nodes)))) as executor:
+        # map() returns the results in the order of nodes
+        for result in executor.map(lambda node: run_on_node(method, resource_path, query_params, node, port), nodes):
+            results.insert(result.node, result)
+    return results
+
+
+def format_json(results:OrderedDict, indent:int=None) -> str:
+    return json.dumps({node: results[node].to_json() for node in results.keys()}, indent=indent)
+
+
+def format_table(results:OrderedDict) -> str:
+    nodes = list(results.keys())
+    width = max([len("NODE")] + [len(node) for node in nodes])
+    lines = [f"{'NODE'.ljust(width)}  RESULT"]
+    for node in nodes:
+        value = results[node].to_json()
+        lines.append(f"{node.ljust(width)}  {value if isinstance(value, str) else json.dumps(value)}")
+    return '\n'.join(lines)
@@ -0,0 +1,321 @@
+"""
+Recording of polled api metrics into a compact columnar file
+
+The file is a header followed by fixed-size blocks, each holding up to
+block_rows samples of every column, stored column by column as little-endian
+float64. The first column is the sample timestamp, in seconds since the epoch.
+
+    header: magic (8 bytes) | version, block_rows, columns, names_len (uint32 each)
+            | column names (json, padded to 8 bytes)
+    block:  rows (uint64) | column 0 values (block_rows doubles) | column 1 values ...
+
+Blocks are only ever appended, so a recording can be read, or memory-mapped,
+while it is being written, and block i is found at a fixed offset.
+"""
+
+import bisect
+import csv
+import json
+import logging
+import math
+import mmap
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+from array import array
+
+from .watch import run_periodic
+
+log = logging.getLogger('scylla.api.recorder')
+
+MAGIC = b'SCYREC\x00\x01'
+VERSION = 1
+DEFAULT_BLOCK_ROWS = 256
+# seconds between writes of the block being filled
+DEFAULT_FLUSH_INTERVAL = 1.0
+TIMESTAMP = 'timestamp'
+
+_HEADER = struct.Struct('<8sIIII')
+_ROWS = struct.Struct('<Q')
+
+
+def _header_size(names_len:int) -> int:
+    return _HEADER.size + (names_len + 7) // 8 * 8
+
+
+def _to_le(values:array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array('d', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class RecordingWriter:
+    """
+    Appends samples to a recording file. At most one block of samples is
+    buffered in memory, so memory use does not grow with the recording.
+    The block being filled is written in place, at most every flush_interval
+    seconds, so an interrupted recording loses at most that many seconds of samples.
+    Appending to an existing recording requires the same columns, and
+    continues its last block if it is not full.
+    """
+    def __init__(self, path:str, metrics:list, block_rows:int=DEFAULT_BLOCK_ROWS,
+                 flush_interval:float=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.columns = [TIMESTAMP] + list(metrics)
+        self.flush_interval = flush_interval
+        self._buffer = [array('d') for _ in self.columns]
+        self._flushed_rows = 0
+        self._last_flush = time.monotonic()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._open_existing(block_rows)
+        else:
+            self.block_rows = block_rows
+            names = json.dumps(self.columns).encode('utf-8')
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, VERSION, block_rows, len(self.columns), len(names)))
+            self._file.write(names.ljust(_header_size(len(names)) - _HEADER.size, b'\0'))
+            self._file.flush()
+            self._block_offset = self._file.tell()
+        self.block_size = _ROWS.size + len(self.columns) * self.block_rows * 8
+
+    def _open_existing(self, block_rows:int):
+        reader = RecordingReader(self.path)
+        try:
+            if reader.columns != self.columns:
+                raise ValueError(f"{self.path} records {reader.columns[1:]}, not {self.columns[1:]}")
+            self.block_rows = reader.block_rows
+            blocks = reader.blocks
+            # continue the last block if it is not full
+            if blocks and reader.block_length(blocks - 1) < reader.block_rows:
+                blocks -= 1
+                for i, column in enumerate(self._buffer):
+                    column.extend(reader.column(blocks, i))
+                self._flushed_rows = len(self._buffer[0])
+            # drop a block left incomplete by an interrupted write
+            self._block_offset = reader.data_offset + blocks * reader.block_size
+            end = reader.data_offset + reader.blocks * reader.block_size
+        finally:
+            reader.close()
+        self._file = open(self.path, 'r+b')
+        self._file.truncate(end)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, timestamp:float, values:list):
+        assert len(values) == len(self.columns) - 1
+        self._buffer[0].append(timestamp)
+        for column, value in zip(self._buffer[1:], values):
+            column.append(value)
+        if len(self._buffer[0]) >= self.block_rows:
+            self.flush()
+            self._block_offset += self.block_size
+            self._flushed_rows = 0
+            for column in self._buffer:
+                del column[:]
+        elif time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the block being filled in place. A partial block keeps its full size.
+        The values are written before the row count, so an interrupted write
+        leaves the block as it was.
+        """
+        self._last_flush = time.monotonic()
+        rows = len(self._buffer[0])
+        if rows == self._flushed_rows:
+            return
+        padding = bytes((self.block_rows - rows) * 8)
+        self._file.seek(self._block_offset + _ROWS.size)
+        for column in self._buffer:
+            self._file.write(_to_le(column))
+            self._file.write(padding)
+        self._file.flush()
+        self._file.seek(self._block_offset)
+        self._file.write(_ROWS.pack(rows))
+        self._file.flush()
+        self._flushed_rows = rows
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+class RecordingReader:
+    """
+    Reads a recording through a read-only memory map, one block at a time.
+    """
+    def __init__(self, path:str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, self.block_rows, ncolumns, names_len = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a recording")
+            self.columns = json.loads(f.read(names_len).decode('utf-8'))
+            if len(self.columns) != ncolumns:
+                raise ValueError(f"{path} has a corrupt header")
+            self.data_offset = _header_size(names_len)
+            self.block_size = _ROWS.size + ncolumns * self.block_rows * 8
+            size = os.fstat(f.fileno()).st_size
+            self.blocks = max(0, size - self.data_offset) // self.block_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.blocks else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return sum(self.block_length(i) for i in range(self.blocks))
+
+    def block_length(self, block:int) -> int:
+        return _ROWS.unpack_from(self._mmap, self.data_offset + block * self.block_size)[0]
+
+    def _column_offset(self, block:int, column:int) -> int:
+        return self.data_offset + block * self.block_size + _ROWS.size + column * self.block_rows * 8
+
+    def column(self, block:int, column:int) -> array:
+        rows = self.block_length(block)
+        offset = self._column_offset(block, column)
+        values = array('d')
+        values.frombytes(self._mmap[offset:offset + rows * 8])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def _timestamp(self, block:int, row:int) -> float:
+        return struct.unpack_from('<d', self._mmap, self._column_offset(block, 0) + row * 8)[0]
+
+    def _block_range(self, start:float=None, end:float=None) -> range:
+        """
+        The blocks holding samples in [start, end], found by binary search on
+        the first timestamp of each block, as samples are appended in time order.
+        """
+        first_timestamps = _BlockTimestamps(self)
+        first = 0
+        if start is not None:
+            first = max(0, bisect.bisect_right(first_timestamps, start) - 1)
+        last = self.blocks
+        if end is not None:
+            last = bisect.bisect_right(first_timestamps, end)
+        return range(first, last)
+
+    def iter_blocks(self, start:float=None, end:float=None):
+        """
+        Yield the columns (as arrays) of each block, limited to the samples in [start, end].
+        """
+        for block in self._block_range(start, end):
+            columns = [self.column(block, i) for i in range(len(self.columns))]
+            timestamps = columns[0]
+            lo = bisect.bisect_left(timestamps, start) if start is not None else 0
+            hi = bisect.bisect_right(timestamps, end) if end is not None else len(timestamps)
+            if lo < hi:
+                yield [c[lo:hi] for c in columns]
+
+    def read(self, start:float=None, end:float=None) -> dict:
+        """
+        Return the samples in [start, end] as a dict of arrays by column name.
+        """
+        result = {name: array('d') for name in self.columns}
+        for columns in self.iter_blocks(start, end):
+            for name, values in zip(self.columns, columns):
+                result[name].extend(values)
+        return result
+
+    def to_numpy(self, start:float=None, end:float=None) -> dict:
+        """
+        Return the samples in [start, end] as a dict of numpy arrays by column name.
+        """
+        import numpy
+        return {name: numpy.asarray(values, dtype=numpy.float64) for name, values in self.read(start, end).items()}
+
+    def to_csv(self, out, start:float=None, end:float=None):
+        """
+        Write the samples in [start, end] to the out text file as csv, one block at a time.
+        """
+        writer = csv.writer(out)
+        writer.writerow(self.columns)
+        for columns in self.iter_blocks(start, end):
+            for row in zip(*columns):
+                writer.writerow(['' if math.isnan(v) else repr(v) for v in row])
+
+
+class _BlockTimestamps:
+    """Sequence view of the first timestamp of each block, for bisect"""
+    def __init__(self, reader:RecordingReader):
+        self.reader = reader
+
+    def __len__(self):
+        return self.reader.blocks
+
+    def __getitem__(self, block:int) -> float:
+        return self.reader._timestamp(block, 0)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+
+class Recorder:
+    """
+    Samples a set of GET requests with a ScyllaRestClient every interval
+    seconds and appends the numeric results to a recording. Failed or
+    non-numeric samples are recorded as NaN.
+    metrics maps each column name to its (resource_path, query_params).
+    """
+    def __init__(self, rest_client, metrics:dict, writer:RecordingWriter):
+        self.rest_client = rest_client
+        self.metrics = metrics
+        self.writer = writer
+
+    def sample_value(self, resource_path:str, query_params:dict=None) -> float:
+        from requests.exceptions import RequestException
+        try:
+            res = self.rest_client.get(resource_path, query_params=query_params)
+        except RequestException as e:
+            log.debug(f"{resource_path}: {e}")
+            return math.nan
+        if res is None or res.status_code != 200:
+            return math.nan
+        try:
+            value = res.json()
+        except ValueError:
+            return math.nan
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return math.nan
+        return float(value)
+
+    def sample(self):
+        timestamp = time.time()
+        self.writer.append(timestamp, [self.sample_value(*request) for request in self.metrics.values()])
+
+    def run(self, interval:float, count:int=None):
+        """
+        Sample every interval seconds, count times or until interrupted.
+        SIGTERM interrupts the recording like Ctrl-C, so the samples taken are written.
+        """
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            run_periodic(self.sample, interval, count=count)
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            self.writer.flush()
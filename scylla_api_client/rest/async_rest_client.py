@@ -0,0 +1,160 @@
+import json as jsonlib
+from typing import Optional
+from logging import getLogger
+
+import aiohttp
+
+from . import DEFAULT_POOL_SIZE
+from .resilience import Timeouts
+
+logger = getLogger(__name__)
+
+
+class AsyncResponse(object):
+    """
+    Response of an AsyncRestClient request, with the body already read.
+    Mirrors the parts of requests.Response used by the api.
+    """
+    def __init__(self, status_code: int, headers: dict, content: bytes, encoding: str = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    def __repr__(self):
+        return f"AsyncResponse(status_code={self.status_code})"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+class AsyncRestClient(object):
+    def __init__(self,
+                 host: str,
+                 port: str,
+                 ssl: bool = False,
+                 endpoint: str = "",
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeouts: Timeouts = None):
+        """
+        Create an asyncio Rest client instance for making http/s requests.
+        The client keeps one keep-alive session, created on first use within the running event loop.
+        Use close() or `async with` to release its connections.
+        :param ssl: should the client work in SSL mode or not
+        :param pool_size: maximum number of connections kept open to the node
+        :param timeouts: connect and read timeouts of the requests, by method class
+        """
+        self.__url_prefix = "https://" if ssl else "http://"
+        self.__host = host
+        self.__port = port
+        self.__endpoint = endpoint
+        self.__pool_size = pool_size
+        self.__session = None
+        self.timeouts = timeouts or Timeouts()
+
+    @property
+    def url_prefix(self):
+        return self.__url_prefix
+
+    @property
+    def host(self):
+        return self.__host
+
+    @property
+    def port(self):
+        return self.__port
+
+    @property
+    def endpoint(self):
+        return self.__endpoint
+
+    @endpoint.setter
+    def endpoint(self, value):
+        self.__endpoint = value
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self.__session is None or self.__session.closed:
+            logger.debug(f"Creating session for {self.__host}:{self.__port} with pool size {self.__pool_size}")
+            self.__session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.__pool_size))
+        return self.__session
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get(self, resource_path: str, query_params: dict = None) -> Optional[AsyncResponse]:
+        """
+        Sends a GET method request to the host resource specified
+        by the resource path. Returns None in case of connection problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the GET request
+        :return: request response
+        :rtype: AsyncResponse
+        """
+        try:
+            return await self.__request("GET", resource_path, query_params)
+        except aiohttp.ClientConnectionError as details:
+            logger.error(f"Connection error: {details}")
+            return None
+
+    async def post(self, resource_path: str, query_params: dict = None, json: dict = None) -> AsyncResponse:
+        """
+        Sends a POST method request to the host resource specified
+        by the resource path. Raises aiohttp.ClientConnectionError in case of problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the POST request
+        :param json: dict object to add as the POST methods json
+        :return: request response
+        :rtype: AsyncResponse
+        """
+        return await self.__request("POST", resource_path, query_params, json=json)
+
+    async def delete(self, resource_path: str, query_params: dict = None) -> AsyncResponse:
+        """
+        Sends a DELETE method request to the host resource specified
+        by the resource path. Raises aiohttp.ClientConnectionError in case of problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the DELETE request
+        :return: request response
+        :rtype: AsyncResponse
+        """
+        return await self.__request("DELETE", resource_path, query_params)
+
+    async def __request(self, method: str, resource_path: str, query_params: dict = None, json: dict = None):
+        headers = {"Host": self.host,
+                   "Content-Type": "application/json"}
+        url = self.__construct_url(resource_path)
+        logger.debug(f"Attempting a {method} request for: {url}")
+        connect, read = self.timeouts.get(method)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        async with self.session.request(method, url, params=self.__query_params(query_params),
+                                        headers=headers, json=json, timeout=timeout) as res:
+            content = await res.read()
+            return AsyncResponse(res.status, dict(res.headers), content, res.charset)
+
+    @staticmethod
+    def __query_params(query_params: dict) -> Optional[dict]:
+        # aiohttp only accepts str, int and float query values
+        if not query_params:
+            return None
+        params = dict()
+        for name, value in query_params.items():
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            params[name] = value if isinstance(value, (str, int, float)) else str(value)
+        return params
+
+    def __construct_url(self, resource_path: str) -> str:
+        return f"{self.__url_prefix}{self.__host}:{self.port}{self.__endpoint}{resource_path}"
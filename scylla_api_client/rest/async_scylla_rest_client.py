@@ -0,0 +1,50 @@
+import logging
+
+from . import DEFAULT_POOL_SIZE
+from .async_rest_client import AsyncRestClient, AsyncResponse
+from .resilience import Timeouts
+
+log = logging.getLogger('scylla.cli')
+
+class AsyncScyllaRestClient(AsyncRestClient):
+    def __init__(self, host: str = "localhost", port: str = "10000", pool_size: int = DEFAULT_POOL_SIZE,
+                 timeouts: Timeouts = None):
+        super().__init__(host=host, port=port, pool_size=pool_size, timeouts=timeouts)
+
+    async def get_raw_api_json(self, resource_path: str = "/api-doc"):
+        if api := await self.get(resource_path):
+            return api.json()
+        return None
+
+    async def get_release_version(self):
+        """
+        Probe the node Scylla release version. Returns None if it could not be determined.
+        """
+        res = await self.get("/storage_service/scylla_release_version")
+        if res is None or res.status_code != 200:
+            return None
+        try:
+            return str(res.json())
+        except ValueError:
+            return None
+
+    async def get(self, resource_path: str, query_params: dict = None):
+        log.debug(f"GET path: {resource_path}, params: {query_params}")
+        return await super().get(resource_path=resource_path, query_params=query_params)
+
+    async def post(self, resource_path: str, query_params: dict = None, json: dict = None):
+        log.debug(f"POST path: {resource_path}, params: {query_params}")
+        return await super().post(resource_path=resource_path, query_params=query_params, json=json)
+
+    async def delete(self, resource_path: str, query_params: dict = None):
+        log.debug(f"DELETE path: {resource_path}, params: {query_params}")
+        return await super().delete(resource_path=resource_path, query_params=query_params)
+
+    async def dispatch_rest_method(self, rest_method_kind: str, **kwargs) -> AsyncResponse:
+        method_to_call_dict = {
+            "GET": self.get,
+            "POST": self.post,
+            "DELETE": self.delete
+        }
+
+        return await method_to_call_dict[rest_method_kind](**kwargs)
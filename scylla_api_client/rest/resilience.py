@@ -0,0 +1,150 @@
+from logging import getLogger
+from threading import Lock
+import random
+import time
+
+logger = getLogger(__name__)
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.1
+DEFAULT_MAX_BACKOFF = 2.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 10.0
+
+# responses worth retrying an idempotent request on
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+
+class Timeouts(object):
+    def __init__(self,
+                 connect: float = DEFAULT_CONNECT_TIMEOUT,
+                 read: float = DEFAULT_READ_TIMEOUT,
+                 write_read: float = None):
+        """
+        Connect and read timeouts of the requests, in seconds, by method class.
+        None waits forever.
+        :param read: read timeout of GET requests
+        :param write_read: read timeout of POST and DELETE requests, that may run
+            long operations like compactions, and wait for them by default
+        """
+        self.connect = connect
+        self.read = read
+        self.write_read = write_read
+
+    def __repr__(self):
+        return f"Timeouts(connect={self.connect}, read={self.read}, write_read={self.write_read})"
+
+    def get(self, rest_method_kind: str) -> tuple:
+        """
+        :return: the (connect, read) timeout of a request, as taken by requests
+        """
+        return self.connect, self.read if rest_method_kind == "GET" else self.write_read
+
+
+class RetryPolicy(object):
+    def __init__(self,
+                 retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        """
+        Retries of idempotent requests after connection errors, timeouts and
+        RETRY_STATUS_CODES responses. Retry n waits a random time of up to
+        backoff * 2**n seconds, capped at max_backoff, so clients that failed
+        together do not retry together.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def __repr__(self):
+        return f"RetryPolicy(retries={self.retries}, backoff={self.backoff}, max_backoff={self.max_backoff})"
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class CircuitBreaker(object):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Fails requests to a node fast once failure_threshold consecutive requests
+        failed to connect or timed out. After reset_timeout seconds, a single
+        trial request is let through: the breaker closes if it succeeds and
+        opens again otherwise.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"CircuitBreaker(name={self.name}, state={self.state}, failures={self.failures})"
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        :return: whether a request may be sent, or must fail fast
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial:
+                    logger.warning(f"{self.name}: opening circuit breaker after {self.failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+_breakers = dict()
+_breakers_lock = Lock()
+
+
+def get_circuit_breaker(host: str, port: str, ssl: bool = False) -> CircuitBreaker:
+    """
+    Return the circuit breaker shared by all clients of (host, port, ssl), created on first use.
+    """
+    key = (host, str(port), ssl)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(f"{host}:{port}")
+            _breakers[key] = breaker
+        return breaker
+
+
+def reset_circuit_breakers():
+    with _breakers_lock:
+        _breakers.clear()
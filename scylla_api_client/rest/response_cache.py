@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from requests import Response
+
+logger = getLogger(__name__)
+
+DEFAULT_TTL = 5.0
+DEFAULT_MAX_ENTRIES = 256
+# larger, or streamed bodies of unknown length, are not cached
+DEFAULT_MAX_BODY_SIZE = 1024 * 1024
+
+
+def parse_ttls(spec: str):
+    """
+    Parse a comma separated list of [path=]seconds TTLs.
+    An entry without a path sets the default TTL.
+    :return: (default_ttl, {path: ttl})
+    :raises ValueError: on an invalid TTL
+    """
+    default_ttl = DEFAULT_TTL
+    ttls = dict()
+    for entry in spec.split(','):
+        if not entry.strip():
+            continue
+        path, _, seconds = entry.rpartition('=')
+        ttl = float(seconds)
+        if ttl < 0:
+            raise ValueError(f"Negative TTL '{entry}'")
+        if path:
+            ttls['/' + path.strip(' /')] = ttl
+        else:
+            default_ttl = ttl
+    return default_ttl, ttls
+
+
+def _module_prefix(resource_path: str) -> str:
+    return '/' + resource_path.strip('/').split('/', 1)[0] + '/'
+
+
+def _copy(res: Response) -> Response:
+    """
+    Return a detached copy of a response whose body was read, that can be
+    handed out any number of times, streamed or not.
+    """
+    from requests import Response
+    copy = Response()
+    copy.status_code = res.status_code
+    copy.headers = res.headers
+    copy.encoding = res.encoding
+    copy.url = res.url
+    copy.reason = res.reason
+    copy.elapsed = res.elapsed
+    copy.request = res.request
+    copy._content = res.content
+    copy._content_consumed = True
+    return copy
+
+
+class ResponseCache(object):
+    def __init__(self,
+                 default_ttl: float = DEFAULT_TTL,
+                 ttls: dict = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_body_size: int = DEFAULT_MAX_BODY_SIZE):
+        """
+        LRU cache of successful GET responses, keyed by node, resource path and
+        query params. Entries expire after the TTL of the longest resource path
+        prefix in ttls, or default_ttl. A TTL of 0 disables caching.
+        POST and DELETE requests invalidate the entries of their api module on the node.
+        :param max_entries: number of responses kept, the least recently used are evicted first
+        :param max_body_size: size of the largest response body kept
+        """
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def ttl(self, resource_path: str) -> float:
+        path = '/' + resource_path.strip('/')
+        while True:
+            if path in self.ttls:
+                return self.ttls[path]
+            if path == '/' or not path:
+                return self.default_ttl
+            path = path.rsplit('/', 1)[0] or '/'
+
+    @staticmethod
+    def key(host: str, port: str, resource_path: str, query_params: dict = None) -> tuple:
+        params = tuple(sorted((str(k), str(v)) for k, v in (query_params or {}).items() if v is not None))
+        return str(host), str(port), resource_path, params
+
+    def get(self, key: tuple) -> Response:
+        """
+        Return a copy of the cached response of key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, res = entry
+                if time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(res)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, res: Response) -> Response:
+        """
+        Cache a successful response, when its TTL is positive and its body is small enough.
+        :return: the response to hand out in place of res
+        """
+        ttl = self.ttl(key[2])
+        if res is None or res.status_code != 200 or ttl <= 0:
+            return res
+        length = res.headers.get('Content-Length')
+        if not res._content_consumed and (length is None or int(length) > self.max_body_size):
+            return res
+        if len(res.content) > self.max_body_size:
+            return res
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, res)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return _copy(res)
+
+    def invalidate(self, host: str, port: str, resource_path: str):
+        """
+        Drop the cached responses of the api module of resource_path on the node.
+        """
+        prefix = _module_prefix(resource_path)
+        with self._lock:
+            stale = [key for key in self._entries
+                     if key[0] == str(host) and key[1] == str(port) and _module_prefix(key[2]) == prefix]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "invalidations": self.invalidations}
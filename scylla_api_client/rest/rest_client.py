@@ -0,0 +1,222 @@
+from typing import Optional
+from threading import Lock
+import time
+
+import requests
+from logging import getLogger
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from . import DEFAULT_POOL_SIZE
+from .resilience import RETRY_STATUS_CODES, CircuitBreaker, RetryPolicy, Timeouts, get_circuit_breaker
+
+logger = getLogger(__name__)
+
+_sessions = dict()
+_sessions_lock = Lock()
+
+
+def get_session(host: str, port: str, ssl: bool = False, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Return the keep-alive session shared by all clients of (host, port, ssl).
+    The session is created on first use, with a connection pool of pool_size connections.
+    :param pool_size: maximum number of connections kept open to the node
+    :return: shared session
+    :rtype: requests.Session
+    """
+    key = (host, str(port), ssl)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            logger.debug(f"Creating session for {key} with pool size {pool_size}")
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://" if ssl else "http://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    """
+    Close all shared sessions and their pooled connections.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a node whose circuit breaker is open"""
+
+
+class RestClient(object):
+    def __init__(self,
+                 host: str,
+                 port: str,
+                 ssl: bool = False,
+                 endpoint: str = "",
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeouts: Timeouts = None,
+                 retry_policy: RetryPolicy = None,
+                 circuit_breaker: CircuitBreaker = None):
+        """
+        Create a Rest client instance for making http/s requests.
+        Clients of the same host, port and ssl mode share one keep-alive session and circuit breaker.
+        :param ssl: should the client work in SSL mode or not
+        :param pool_size: connection pool size of the shared session, used when the session is created
+        :param timeouts: connect and read timeouts of the requests, by method class
+        :param retry_policy: retries of GET requests
+        :param circuit_breaker: circuit breaker of the node, replacing the shared one
+        """
+        self.__url_prefix = "https://" if ssl else "http://"
+        self.__host = host
+        self.__port = port
+        self.__endpoint = endpoint
+        self.__session = get_session(host, port, ssl=ssl, pool_size=pool_size)
+        self.timeouts = timeouts or Timeouts()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(host, port, ssl=ssl)
+
+    @property
+    def url_prefix(self):
+        return self.__url_prefix
+
+    @property
+    def host(self):
+        return self.__host
+
+    @property
+    def port(self):
+        return self.__port
+
+    @property
+    def session(self):
+        return self.__session
+
+    @property
+    def endpoint(self):
+        return self.__endpoint
+
+    @endpoint.setter
+    def endpoint(self, value):
+        self.__endpoint = value
+
+    def get(self, resource_path: str, query_params: dict = None, stream: bool = False,
+            headers: dict = None) -> Optional[Response]:
+        """
+        Sends a GET method request to the host resource specified
+        by the resource path. Returns a Response type response and throws
+        a ConnectionError in case of problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the GET request
+        :param stream: do not read the response body until it is accessed
+        :param headers: dict with additional request headers
+        :return: request response
+        :rtype: Response
+        """
+        # construct request headers
+        extra_headers = headers
+        headers = {"Host": self.host,
+                   "Content-Type": "application/json"}
+
+        # add additional headers if needed
+        if extra_headers:
+            headers.update(extra_headers)
+        logger.debug(f"Using headers: {headers}")
+
+        # construct url string
+        url = self.__construct_url(resource_path)
+
+        logger.debug(f"Attempting a GET request for: {url}")
+        try:
+            return self.__send("GET", url=url, params=query_params, headers=headers, stream=stream)
+        except (ConnectionError, Timeout) as details:
+            logger.error(f"Connection error: {details}")
+            return None
+
+    def post(self, resource_path: str, query_params: dict = None, json: dict = None, stream: bool = False) -> Response:
+        """
+        Sends a POST method request to the host resource specified
+        by the resource path. Returns a Response type response and throws
+        a ConnectionError in case of problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the GET request
+        :param json: dict object to add as the POST methods json
+        :param stream: do not read the response body until it is accessed
+        :return: request response
+        :rtype: Response
+        """
+        # construct request headers
+        headers = {"Host": self.host,
+                   "Content-Type": "application/json"}
+
+        # add additional headers if needed
+        logger.debug(f"Using headers: {headers}")
+
+        # construct url string
+        url = self.__construct_url(resource_path)
+
+        logger.debug(f"Attempting a POST request for: {url}")
+        return self.__send("POST", url=url, params=query_params, headers=headers, json=json, stream=stream)
+
+    def delete(self, resource_path: str, query_params: dict = None, stream: bool = False) -> Response:
+        """
+        Sends a DELETE method request to the host resource specified
+        by the resource path. Returns a Response type response and throws
+        a ConnectionError in case of problems.
+        :param resource_path: string with the path to the resource
+        :param query_params: dict with params to add to the GET request
+        :param stream: do not read the response body until it is accessed
+        :return: request response
+        :rtype: Response
+        """
+        # construct request headers
+        headers = {"Host": self.host,
+                   "Content-Type": "application/json"}
+
+        # add additional headers if needed
+        logger.debug(f"Using headers: {headers}")
+
+        # construct url string
+        url = self.__construct_url(resource_path)
+
+        logger.debug(f"Attempting a DELETE request for: {url}")
+        return self.__send("DELETE", url=url, params=query_params, headers=headers, stream=stream)
+
+    def __send(self, rest_method_kind: str, **kwargs) -> Response:
+        """
+        Send a request with the method class timeouts, through the node circuit breaker.
+        GET requests are retried according to the retry policy.
+        :raises CircuitOpenError: without sending the request, when the breaker is open
+        """
+        retries = self.retry_policy.retries if rest_method_kind == "GET" else 0
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"{self.circuit_breaker.name}: failing fast after "
+                                       f"{self.circuit_breaker.failures} consecutive failures")
+            try:
+                res = self.__session.request(rest_method_kind, timeout=self.timeouts.get(rest_method_kind), **kwargs)
+            except (ConnectionError, Timeout) as details:
+                self.circuit_breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                logger.debug(f"Retrying {rest_method_kind} {kwargs['url']} after: {details}")
+            except Exception:
+                # not retried, but recorded, or a half-open breaker would wait for its trial forever
+                self.circuit_breaker.record_failure()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                if res.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                    return res
+                logger.debug(f"Retrying {rest_method_kind} {kwargs['url']} after status {res.status_code}")
+                res.close()
+            time.sleep(self.retry_policy.delay(attempt))
+            attempt += 1
+
+    def __construct_url(self, resource_path: str) -> str:
+        return f"{self.__url_prefix}{self.__host}:{self.port}{self.__endpoint}{resource_path}"
@@ -1,38 +1,142 @@
 import logging
+import time
 from requests import Response
 
-from . import RestClient
+from . import DEFAULT_POOL_SIZE
+from .rest_client import RestClient
+from .. import timing
+from .resilience import RetryPolicy, Timeouts
+from .response_cache import ResponseCache
 
 log = logging.getLogger('scylla.cli')
 
+
+class ApiDocument(object):
+    """
+    Result of a conditional api document request: status_code is None when the
+    node could not be reached, 304 when the copy the validators were taken from
+    is still valid, and api_json holds the document otherwise.
+    """
+    def __init__(self, status_code: int = None, api_json=None, validators: dict = None):
+        self.status_code = status_code
+        self.api_json = api_json
+        self.validators = validators or dict()
+
+    def __repr__(self):
+        return f"ApiDocument(status_code={self.status_code}, validators={self.validators})"
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
 class ScyllaRestClient(RestClient):
-    def __init__(self, host: str = "localhost", port: str = "10000"):
-        super().__init__(host=host, port=port)
+    def __init__(self, host: str = "localhost", port: str = "10000", pool_size: int = DEFAULT_POOL_SIZE,
+                 response_cache: ResponseCache = None, timeouts: Timeouts = None, retry_policy: RetryPolicy = None):
+        super().__init__(host=host, port=port, pool_size=pool_size, timeouts=timeouts, retry_policy=retry_policy)
+        # optional cache of the GET responses of dispatch_rest_method
+        self.response_cache = response_cache
 
     def get_raw_api_json(self, resource_path: str = "/api-doc"):
         if api := self.get(resource_path):
             return api.json()
         return None
 
-    def get(self, resource_path: str, query_params: dict = None):
+    def get_api_document(self, resource_path: str = "/api-doc", validators: dict = None) -> ApiDocument:
+        """
+        Fetch an api document. With the validators of a previously fetched copy,
+        the request is conditional, and the document is only sent if it changed.
+        :param validators: {"etag": ..., "last_modified": ...} of the previous copy
+        """
+        headers = dict()
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        res = self.get(resource_path, headers=headers)
+        if res is None:
+            return ApiDocument()
+        if res.status_code == 304:
+            log.debug(f"{resource_path} not modified")
+            return ApiDocument(304, validators=validators)
+        new_validators = {name: res.headers[header] for name, header in [("etag", "ETag"), ("last_modified", "Last-Modified")]
+                          if res.headers.get(header)}
+        log.debug(f"{resource_path}: {res.headers.get('Content-Length', 'chunked')} bytes transferred, "
+                  f"{res.headers.get('Content-Encoding', 'identity')} encoded, validators {new_validators}")
+        if res.status_code != 200:
+            return ApiDocument(res.status_code)
+        try:
+            return ApiDocument(200, res.json(), new_validators)
+        except ValueError:
+            return ApiDocument(res.status_code)
+
+    def get_release_version(self):
+        """
+        Probe the node Scylla release version. Returns None if it could not be determined.
+        """
+        res = self.get("/storage_service/scylla_release_version")
+        if res is None or res.status_code != 200:
+            return None
+        try:
+            return str(res.json())
+        except ValueError:
+            return None
+
+    def get(self, resource_path: str, query_params: dict = None, stream: bool = False, headers: dict = None):
         log.debug(f"GET path: {resource_path}, params: {query_params}")
-        return super().get(resource_path=resource_path, query_params=query_params)
+        return super().get(resource_path=resource_path, query_params=query_params, stream=stream, headers=headers)
 
-    def post(self, resource_path: str, query_params: dict = None, json: dict = None):
+    def post(self, resource_path: str, query_params: dict = None, json: dict = None, stream: bool = False):
         log.debug(f"POST path: {resource_path}, params: {query_params}")
-        return super().post(resource_path=resource_path, query_params=query_params, json=json)
+        return super().post(resource_path=resource_path, query_params=query_params, json=json, stream=stream)
 
-    def delete(self, resource_path: str, query_params: dict = None):
+    def delete(self, resource_path: str, query_params: dict = None, stream: bool = False):
         log.debug(f"DELETE path: {resource_path}, params: {query_params}")
-        return super().delete(resource_path=resource_path, query_params=query_params)
+        return super().delete(resource_path=resource_path, query_params=query_params, stream=stream)
 
-    def dispatch_rest_method(self, rest_method_kind: str, **kwargs) -> Response:
+    def dispatch_rest_method(self, rest_method_kind: str, use_cache: bool = True, path_template: str = None,
+                             **kwargs) -> Response:
+        """
+        Send a GET, POST or DELETE request. With a response cache, GET responses
+        are served from the cache unless use_cache is False, and POST and DELETE
+        requests invalidate the cached responses of their module.
+        The request latency is recorded under path_template, the unresolved api path
+        of the method (e.g. /system/logger/{name}), or under resource_path without it.
+        """
         method_to_call_dict = {
             "GET": self.get,
             "POST": self.post,
             "DELETE": self.delete
         }
 
-        return method_to_call_dict[rest_method_kind](**kwargs)
+        cache = self.response_cache
+        if cache is None:
+            return self._timed(method_to_call_dict[rest_method_kind], rest_method_kind, path_template, **kwargs)
+        if rest_method_kind != "GET":
+            try:
+                return self._timed(method_to_call_dict[rest_method_kind], rest_method_kind, path_template, **kwargs)
+            finally:
+                cache.invalidate(self.host, self.port, kwargs["resource_path"])
+        key = cache.key(self.host, self.port, kwargs["resource_path"], kwargs.get("query_params"))
+        if use_cache:
+            res = cache.get(key)
+            if res is not None:
+                log.debug(f"GET path: {kwargs['resource_path']}, params: {kwargs.get('query_params')} (cached)")
+                return res
+        return cache.put(key, self._timed(self.get, rest_method_kind, path_template, **kwargs))
+
+    @staticmethod
+    def _timed(method_to_call, rest_method_kind: str, path_template: str = None, **kwargs) -> Response:
+        """
+        Call the request method, recording its latency, up to the response headers for streamed responses.
+        """
+        start = time.perf_counter()
+        try:
+            return method_to_call(**kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            timing.record_phase("request", elapsed)
+            timing.record_latency(f"{rest_method_kind} {path_template or kwargs['resource_path']}", elapsed)
 
 
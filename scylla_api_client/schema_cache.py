@@ -0,0 +1,95 @@
+"""
+On-disk cache of the parsed Scylla REST API schema
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+
+log = logging.getLogger('scylla.api.cache')
+
+
+class SchemaCache:
+    """
+    Stores the parsed api schema of a node in a json file per host/port.
+    A cached schema is valid only for the Scylla release version it was
+    fetched from. Schemas of other versions are still read by get_entry(),
+    to revalidate their documents with the node rather than fetch them again.
+    """
+    # bump when the layout of the cached schema changes
+    FORMAT = 2
+
+    def __init__(self, cache_dir:str=None):
+        self.cache_dir = cache_dir or self.default_dir()
+
+    def __repr__(self):
+        return f"SchemaCache(cache_dir={self.cache_dir})"
+
+    @staticmethod
+    def default_dir() -> str:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'scylla-api-client')
+
+    def path(self, host:str, port) -> str:
+        # keep the file name safe for ipv6 addresses and host names
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', f"{host}_{port}")
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def get_entry(self, host:str, port):
+        """
+        Return the cached {'version': ..., 'schema': ...} entry for host:port,
+        whatever its release version, or None.
+        """
+        path = self.path(host, port)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable schema cache {path}: {e}")
+            return None
+        if entry.get('format') != self.FORMAT or not isinstance(entry.get('schema'), dict):
+            log.debug(f"Ignoring schema cache {path} of format {entry.get('format')}")
+            return None
+        return entry
+
+    def get(self, host:str, port, version:str):
+        """
+        Return the cached schema for host:port if it was stored for the given
+        release version, None otherwise.
+        """
+        entry = self.get_entry(host, port)
+        if entry is None:
+            return None
+        if entry.get('version') != version:
+            log.debug(f"Schema cache {self.path(host, port)} is stale: version={entry.get('version')}")
+            return None
+        return entry.get('schema')
+
+    def put(self, host:str, port, version:str, schema:dict):
+        path = self.path(host, port)
+        entry = {'format': self.FORMAT, 'version': version, 'schema': schema}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first so readers never see a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.schema-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            log.warning(f"Failed to write schema cache {path}: {e}")
+            return
+        log.debug(f"Stored schema for {host}:{port} version {version} in {path}")
+
+    def invalidate(self, host:str, port):
+        try:
+            os.unlink(self.path(host, port))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,151 @@
+"""
+Interactive Scylla REST API shell
+"""
+
+import cmd
+import logging
+import shlex
+from pprint import PrettyPrinter
+
+from .api import ScyllaApi, ScyllaApiCommand, ScyllaApiError
+from .cli import Lister, load_api
+from .schema_cache import SchemaCache
+
+log = logging.getLogger('scylla.cli.shell')
+
+
+class ApiShell(cmd.Cmd):
+    """
+    Interactive shell running api commands against a loaded ScyllaApi.
+    The schema and the node connection are kept between commands, and module,
+    command, method and option names are completed from the loaded schema.
+    """
+    intro = "Scylla api shell. Type 'help' for the shell commands, or a '[module] command [METHOD] [args...]' to run."
+
+    def __init__(self, scylla_api:ScyllaApi, schema_cache:SchemaCache=None, pretty_printer:PrettyPrinter=None):
+        super().__init__()
+        self.schema_cache = schema_cache
+        self.pretty_printer = pretty_printer
+        self.set_api(scylla_api)
+
+    def set_api(self, scylla_api:ScyllaApi):
+        self.scylla_api = scylla_api
+        self.lister = Lister(scylla_api)
+        self.prompt = f"{scylla_api.host}:{scylla_api.port}> "
+
+    def preloop(self):
+        try:
+            import readline
+        except ImportError:
+            return
+        # module and command names contain '/' and '{name}' path arguments
+        readline.set_completer_delims(' \t\n')
+
+    def emptyline(self):
+        pass
+
+    def default(self, line:str):
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(e)
+            return
+        if argv[0].strip(' /') in self.scylla_api.modules and len(argv) == 1:
+            self.lister.list_module_commands(self.scylla_api.modules[argv[0].strip(' /')])
+            return
+        try:
+            command, argv = self.scylla_api.find_command(argv)
+        except ScyllaApiError as e:
+            print(e)
+            return
+        try:
+            command.invoke(node_address=self.scylla_api.host, port=self.scylla_api.port, argv=argv,
+                           pretty_printer=self.pretty_printer)
+        except SystemExit:
+            # argparse exits on invalid options
+            pass
+
+    def do_list(self, arg:str):
+        """list [module]: list the api modules, or the commands of a module"""
+        if arg.strip():
+            self.lister.list_api(list_module_commands=arg.strip(' /'))
+        else:
+            self.lister.list_modules()
+
+    def complete_list(self, text:str, line:str, begidx:int, endidx:int):
+        return [name for name in self.scylla_api.modules.keys() if name.startswith(text)]
+
+    def do_connect(self, arg:str):
+        """connect address [port]: switch to another node"""
+        argv = arg.split()
+        if not argv or len(argv) > 2:
+            print("usage: connect address [port]")
+            return
+        port = argv[1] if len(argv) > 1 else self.scylla_api.port
+        scylla_api = load_api(node_address=argv[0], port=port, schema_cache=self.schema_cache)
+        if not len(scylla_api.modules):
+            print(f"Could not load the api of {argv[0]}:{port}")
+            return
+        self.set_api(scylla_api)
+
+    def do_pprint(self, arg:str):
+        """pprint on|off: turn pretty printing of results on or off"""
+        if arg.strip() == 'on':
+            self.pretty_printer = self.pretty_printer or PrettyPrinter(width=200, indent=1)
+        elif arg.strip() == 'off':
+            self.pretty_printer = None
+        else:
+            print(f"pprint is {'on' if self.pretty_printer else 'off'}")
+
+    def do_exit(self, arg:str):
+        """exit: exit the shell"""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg:str):
+        print()
+        return True
+
+    def completenames(self, text:str, *ignored):
+        shell_names = super().completenames(text, *ignored)
+        return shell_names + self.complete_command_name(text)
+
+    def complete_command_name(self, text:str) -> list:
+        """
+        Complete a module name, or a 'module/command' path once the module is given.
+        """
+        module_name, sep, command_prefix = text.partition('/')
+        if not sep:
+            return [f"{name}/" for name in self.scylla_api.modules.keys() if name.startswith(text)]
+        try:
+            module = self.scylla_api.modules[module_name]
+        except KeyError:
+            return []
+        return [f"{module_name}/{name}" for name in module.commands.keys() if name.startswith(command_prefix)]
+
+    def completedefault(self, text:str, line:str, begidx:int, endidx:int):
+        try:
+            argv = shlex.split(line[:begidx])
+        except ValueError:
+            return []
+        if len(argv) == 1 and argv[0].strip(' /') in self.scylla_api.modules:
+            module = self.scylla_api.modules[argv[0].strip(' /')]
+            return [name for name in module.commands.keys() if name.startswith(text)]
+        try:
+            command, argv = self.scylla_api.find_command(argv)
+        except ScyllaApiError:
+            return []
+        kind_strings = [ScyllaApiCommand.Method.kind_to_str[kind] for kind in command.methods]
+        if not argv and not text.startswith('-'):
+            return [kind_str for kind_str in kind_strings if kind_str.startswith(text.upper())]
+        methods = command.methods.values()
+        if argv and argv[0] in kind_strings:
+            methods = [command.methods[ScyllaApiCommand.Method.str_to_kind[argv[0]]]]
+        names = []
+        for method in methods:
+            for name in method.options.keys():
+                opt = f"--{name}"
+                if opt.startswith(text) and opt not in names and opt not in argv:
+                    names.append(opt)
+        return names
@@ -0,0 +1,121 @@
+"""
+Streaming of api responses, without holding the whole body in memory
+"""
+
+import codecs
+import json
+import logging
+import sys
+
+log = logging.getLogger('scylla.api.streaming')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+def write_stream(chunks, out=None) -> bool:
+    """
+    Write the response body chunks to out as they arrive.
+    out is a binary file, or None for stdout. When stdout has no binary buffer
+    the chunks are decoded and written as text.
+    Returns True if the body ended with a newline.
+    """
+    if out is None:
+        out = getattr(sys.stdout, 'buffer', None)
+        if out is None:
+            return _write_text_stream(chunks, sys.stdout)
+        # keep the order with anything already printed
+        sys.stdout.flush()
+    last = b''
+    for chunk in chunks:
+        if chunk:
+            out.write(chunk)
+            last = chunk
+    out.flush()
+    return last.endswith(b'\n')
+
+
+def _write_text_stream(chunks, out) -> bool:
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    last = ''
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            out.write(text)
+            last = text
+    text = decoder.decode(b'', final=True)
+    if text:
+        out.write(text)
+        last = text
+    return last.endswith('\n')
+
+
+def iter_json_array(chunks):
+    """
+    Parse a json document from the body chunks, yielding the elements of a
+    top-level array as soon as each one is complete.
+    A document that is not an array is yielded as a single value.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    json_decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        # drop the consumed text so the buffer only holds the pending element
+        buf = buf[pos:]
+        pos = 0
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                buf += text
+                return True
+        buf += decoder.decode(b'', final=True)
+        eof = True
+        return True
+
+    def skip(chars:str) -> str:
+        """Skip whitespace and chars, return the next character or '' at the end of the body."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and (buf[pos] in _WHITESPACE or buf[pos] in chars):
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ''
+
+    first = skip('')
+    if first != '[':
+        # not an array, parse the whole document
+        while fill():
+            pass
+        if buf[pos:].strip():
+            yield json.loads(buf[pos:])
+        return
+    pos += 1
+    while True:
+        c = skip(',')
+        if not c:
+            raise ValueError("Unterminated json array")
+        if c == ']':
+            return
+        while True:
+            try:
+                value, end = json_decoder.raw_decode(buf, pos)
+                # numbers are not self delimiting, the value is complete
+                # only once the delimiter that follows it has arrived
+                if (end < len(buf) and buf[end] in _WHITESPACE + ',]') or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        pos = end
+        yield value
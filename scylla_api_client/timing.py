@@ -0,0 +1,160 @@
+"""
+Timing of the client phases and latency histograms of the api requests.
+Only the standard library is imported here, so the module can be imported
+first thing to time the rest of the startup.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+# taken by mark_start(), as early as the entry point calls it
+STARTED = None
+STARTUP_CPU = None
+
+# histogram buckets grow by 10% from 10us, bounding the percentile error to 10%
+_MIN_LATENCY = 1e-5
+_GROWTH = 1.1
+_LOG_GROWTH = math.log(_GROWTH)
+
+_lock = Lock()
+_phases = dict()
+_latencies = dict()
+_startup_recorded = False
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of latencies in seconds, taking constant memory
+    whatever the number of samples.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._buckets = dict()
+
+    def __repr__(self):
+        return f"LatencyHistogram({self.stats()})"
+
+    def add(self, seconds:float):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        bucket = int(math.log(seconds / _MIN_LATENCY) / _LOG_GROWTH) + 1 if seconds > _MIN_LATENCY else 0
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, p:float) -> float:
+        """
+        Return the latency below which p percent of the samples fall, as the upper bound of its bucket.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(self.max, _MIN_LATENCY * _GROWTH ** bucket)
+        return self.max
+
+    def stats(self) -> dict:
+        return {'count': self.count,
+                'mean': self.total / self.count if self.count else None,
+                'p50': self.percentile(50), 'p95': self.percentile(95), 'p99': self.percentile(99),
+                'min': self.min, 'max': self.max}
+
+
+def record_phase(name:str, seconds:float):
+    with _lock:
+        entry = _phases.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+@contextmanager
+def phase(name:str):
+    """
+    Time the enclosed block as phase name.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def mark_start():
+    """
+    Take the startup markers, on the first call only.
+    """
+    global STARTED, STARTUP_CPU
+    if STARTED is None:
+        STARTED = time.perf_counter()
+        STARTUP_CPU = time.process_time()
+
+
+def record_startup():
+    """
+    Record the interpreter startup cpu time and the import time up to now, once per process.
+    """
+    global _startup_recorded
+    mark_start()
+    with _lock:
+        if _startup_recorded:
+            return
+        _startup_recorded = True
+    record_phase('interpreter startup (cpu)', STARTUP_CPU)
+    record_phase('imports', time.perf_counter() - STARTED)
+
+
+def record_latency(endpoint:str, seconds:float):
+    with _lock:
+        histogram = _latencies.get(endpoint)
+        if histogram is None:
+            histogram = _latencies[endpoint] = LatencyHistogram()
+        histogram.add(seconds)
+
+
+def phases() -> list:
+    """
+    Return the (name, count, total seconds) of the timed phases, in the order they were first recorded.
+    """
+    with _lock:
+        return [(name, count, total) for name, (count, total) in _phases.items()]
+
+
+def latency_histograms() -> dict:
+    """
+    Return the latency statistics of each endpoint, as 'METHOD path', accumulated since the last reset.
+    """
+    with _lock:
+        return {endpoint: histogram.stats() for endpoint, histogram in _latencies.items()}
+
+
+def reset(latencies:bool=False):
+    with _lock:
+        _phases.clear()
+        if latencies:
+            _latencies.clear()
+
+
+def _ms(seconds:float) -> str:
+    return f"{seconds * 1000:.2f}" if seconds is not None else '-'
+
+
+def format_report() -> str:
+    lines = [f"{'phase':<50} {'count':>6} {'total ms':>10}"]
+    for name, count, total in phases():
+        lines.append(f"{name:<50} {count:>6} {_ms(total):>10}")
+    histograms = latency_histograms()
+    if histograms:
+        lines.append('')
+        lines.append(f"{'endpoint':<50} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+        for endpoint, stats in histograms.items():
+            lines.append(f"{endpoint:<50} {stats['count']:>6} {_ms(stats['p50']):>10} {_ms(stats['p95']):>10} "
+                         f"{_ms(stats['p99']):>10} {_ms(stats['max']):>10}")
+    return '\n'.join(lines)
@@ -0,0 +1,134 @@
+"""
+Periodic polling of an api method, with deltas and rates of numeric results
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+
+log = logging.getLogger('scylla.api.watch')
+
+UPTIME_PATH = "/system/uptime_ms"
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Sample:
+    def __init__(self, time:float, value=None, error:str=None, uptime_ms:int=None):
+        # monotonic time the response was received
+        self.time = time
+        self.value = value
+        self.error = error
+        self.uptime_ms = uptime_ms
+
+    def __repr__(self):
+        return f"Sample(time={self.time}, value={self.value}, error={self.error}, uptime_ms={self.uptime_ms})"
+
+
+class Watcher:
+    """
+    Re-issues a request every interval seconds over the client keep-alive
+    connection, and prints each result. For numeric results, the change since
+    the previous sample and its rate per second are printed as well.
+    The node uptime is sampled along, to detect node restarts, after which
+    the deltas start over.
+    """
+    def __init__(self, rest_client, rest_method_kind:str, resource_path:str, query_params:dict, interval:float,
+                 path_template:str=None):
+        if interval <= 0:
+            raise ValueError("The watch interval must be positive")
+        self.rest_client = rest_client
+        self.rest_method_kind = rest_method_kind
+        self.resource_path = resource_path
+        self.query_params = query_params
+        self.interval = interval
+        self.path_template = path_template
+
+    def sample(self) -> Sample:
+        from requests.exceptions import RequestException
+        try:
+            res = self.rest_client.dispatch_rest_method(rest_method_kind=self.rest_method_kind, use_cache=False,
+                                                        path_template=self.path_template,
+                                                        resource_path=self.resource_path,
+                                                        query_params=self.query_params)
+            uptime = None
+            if self.resource_path != UPTIME_PATH:
+                uptime = self.rest_client.get(UPTIME_PATH)
+        except RequestException as e:
+            return Sample(time.monotonic(), error=str(e))
+        now = time.monotonic()
+        if res is None:
+            return Sample(now, error="Connection error")
+        try:
+            value = res.json()
+        except ValueError:
+            value = res.text
+        if res.status_code != 200:
+            return Sample(now, error=f"{res.status_code}: {value}")
+        if self.resource_path == UPTIME_PATH:
+            uptime_ms = value
+        else:
+            uptime_ms = uptime.json() if uptime is not None and uptime.status_code == 200 else None
+        return Sample(now, value=value, uptime_ms=uptime_ms if is_number(uptime_ms) else None)
+
+    @staticmethod
+    def restarted(prev:Sample, cur:Sample) -> bool:
+        return prev.uptime_ms is not None and cur.uptime_ms is not None and cur.uptime_ms < prev.uptime_ms
+
+    def format(self, prev:Sample, cur:Sample) -> str:
+        stamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        if cur.error is not None:
+            return f"{stamp}  error: {cur.error}"
+        value = cur.value if is_number(cur.value) or isinstance(cur.value, str) else json.dumps(cur.value)
+        line = f"{stamp}  {value}"
+        if prev is None:
+            return line
+        if self.restarted(prev, cur):
+            return f"{line}  (node restarted)"
+        if not is_number(cur.value) or not is_number(prev.value):
+            return line
+        delta = cur.value - prev.value
+        elapsed = cur.time - prev.time
+        rate = delta / elapsed if elapsed > 0 else 0.0
+        return f"{line}  delta={delta:+}  rate={rate:.2f}/s"
+
+    def run(self, count:int=None):
+        """
+        Sample and print the result every interval seconds, count times or until interrupted.
+        """
+        prev = None
+
+        def tick():
+            nonlocal prev
+            cur = self.sample()
+            print(self.format(prev, cur), flush=True)
+            # deltas and restarts are relative to the last successful sample
+            if cur.error is None:
+                prev = cur
+
+        run_periodic(tick, self.interval, count=count)
+
+
+def run_periodic(fn, interval:float, count:int=None):
+    """
+    Call fn every interval seconds, count times or until interrupted.
+    Calls are scheduled at fixed times from the start on the monotonic clock,
+    so the period does not drift with the duration of fn. Intervals missed
+    because fn took too long are skipped.
+    """
+    start = time.monotonic()
+    tick = 0
+    calls = 0
+    try:
+        while True:
+            fn()
+            calls += 1
+            if count is not None and calls >= count:
+                break
+            tick = max(tick + 1, int((time.monotonic() - start) / interval) + 1)
+            time.sleep(max(0.0, start + tick * interval - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
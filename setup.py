@@ -15,6 +15,10 @@ setup(
     include_package_data=True,
     python_requires='>=3.6',
     install_requires=['requests'],
+    extras_require={
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+    },
     use_scm_version=True,
     setup_requires=['setuptools_scm'],
     entry_points={
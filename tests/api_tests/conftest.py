@@ -8,6 +8,7 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import pytest
 
+from scylla_api_client.api import ScyllaApi
 
 LOGGER = logging.getLogger("scyllaapiserver")
 
@@ -810,6 +811,21 @@ class ScyllaAPIBasicRequestHandler(BaseHTTPRequestHandler):
         return json_resp
 
 
+class ErrorRequestHandler(ScyllaAPIBasicRequestHandler):
+    """Serves the api documents, and answers /system/uptime_ms with a 503"""
+    def do_GET(self):
+        if not self.path.startswith("/system/uptime_ms"):
+            return super().do_GET()
+        content = b'{"message": "Not ready", "code": 503}'
+        self.send_response(503)
+        self.send_header("Content-Length", f"{len(content)}")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
 class ScyllaApiServer:
     def __init__(self, port):
         self.host = "localhost"
@@ -825,6 +841,7 @@ class ScyllaApiServer:
         LOGGER.info("Shutdown server")
         if self.httpd:
             self.httpd.shutdown()
+            self.httpd.server_close()
 
 
 @pytest.fixture(scope="module")
@@ -835,3 +852,19 @@ def api_server():
     time.sleep(2)
     yield httpd
     httpd.stop_server()
+
+
+@pytest.fixture(scope="module")
+def scylla_api_obj(api_server):
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    scylla_api.load()
+    return scylla_api
+
+
+@pytest.fixture
+def error_server():
+    server = HTTPServer(("localhost", 0), ErrorRequestHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
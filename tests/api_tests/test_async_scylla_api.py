@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from scylla_api_client.api import MissingArgumentError
+from scylla_api_client.async_api import AsyncScyllaApi
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_async_load(api_server):
+    async def load():
+        async with AsyncScyllaApi(api_server.host, api_server.port) as scylla_api:
+            await scylla_api.load()
+            return scylla_api
+
+    scylla_api = run(load())
+    assert list(scylla_api.modules.keys()) == ["system", "compaction_manager", "error_injection", "v2"]
+    assert all(module.loaded for module in scylla_api.modules.items())
+    assert list(scylla_api.modules["system"].commands.keys()) == ["logger", "drop_sstable_caches", "uptime_ms", "logger/{name}"]
+
+
+def test_async_dispatch(api_server):
+    async def dispatch():
+        async with AsyncScyllaApi(api_server.host, api_server.port) as scylla_api:
+            await scylla_api.load()
+            return await asyncio.gather(scylla_api.dispatch("system/uptime_ms"),
+                                        scylla_api.dispatch("system/logger/{name}", "GET", name="httpd"))
+
+    uptime, logger = run(dispatch())
+    assert uptime.status_code == 200
+    assert "/system/uptime_ms" in uptime.json()
+    assert "/system/logger/httpd" in logger.json()
+
+
+def test_async_dispatch_missing_path_argument(api_server):
+    async def dispatch():
+        async with AsyncScyllaApi(api_server.host, api_server.port) as scylla_api:
+            await scylla_api.load()
+            await scylla_api.dispatch("system/logger/{name}", "GET")
+
+    with pytest.raises(MissingArgumentError):
+        run(dispatch())
+
+
+def test_async_call(api_server):
+    async def call():
+        async with AsyncScyllaApi(api_server.host, api_server.port) as scylla_api:
+            await scylla_api.load()
+            return await asyncio.gather(scylla_api.call("system/logger/{name}", name="httpd"),
+                                        scylla_api.call("uptime_ms", raw=True))
+
+    logger, raw = run(call())
+    assert "/system/logger/httpd" in logger
+    assert isinstance(raw, bytes) and b"/system/uptime_ms" in raw
+
+
+def test_async_call_errors(error_server):
+    from scylla_api_client.api import ApiResponseError, NodeConnectionError
+
+    async def call():
+        async with AsyncScyllaApi("localhost", error_server.server_address[1]) as scylla_api:
+            await scylla_api.load()
+            with pytest.raises(MissingArgumentError):
+                await scylla_api.call("system/logger/{name}")
+            with pytest.raises(ApiResponseError, match="Not ready") as e:
+                await scylla_api.call("system/uptime_ms")
+            assert e.value.status_code == 503
+            error_server.shutdown()
+            error_server.server_close()
+            with pytest.raises(NodeConnectionError):
+                await scylla_api.call("system/uptime_ms")
+
+    run(call())
+
+
+def test_async_dispatch_checks_options(api_server):
+    from scylla_api_client.api import ScyllaApiError
+
+    async def dispatch():
+        async with AsyncScyllaApi(api_server.host, api_server.port) as scylla_api:
+            await scylla_api.load()
+            await scylla_api.dispatch("system/uptime_ms", "GET", no_such_option=1)
+
+    with pytest.raises(ScyllaApiError, match="unknown option"):
+        run(dispatch())
+
+
+def test_async_client_options():
+    from scylla_api_client.rest.resilience import RetryPolicy, Timeouts
+    timeouts = Timeouts(connect=1, read=2)
+    assert AsyncScyllaApi(timeouts=timeouts).client.timeouts is timeouts
+    with pytest.raises(ValueError):
+        AsyncScyllaApi(retry_policy=RetryPolicy())
+    with pytest.raises(ValueError):
+        AsyncScyllaApi(response_cache=object())
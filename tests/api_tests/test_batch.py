@@ -0,0 +1,33 @@
+import io
+
+import pytest
+
+from scylla_api_client.batch import Batch, read_lines
+
+
+BATCH = """
+# uptime
+system/uptime_ms
+system logger/{name} GET --name httpd
+compactions
+system/logger/{name} GET
+no_such_module/command
+"""
+
+
+def test_read_lines():
+    lines = read_lines(io.StringIO(BATCH))
+    assert [line_number for line_number, _ in lines] == [3, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize("parallel", [1, 4])
+def test_batch_run(scylla_api_obj, parallel):
+    records = list(Batch(scylla_api_obj).run(read_lines(io.StringIO(BATCH)), parallel=parallel))
+
+    assert [record.line_number for record in records] == [3, 4, 5, 6, 7]
+    assert [record.ok for record in records] == [True, True, True, False, False]
+    assert "/system/uptime_ms" in records[0].value
+    assert "/system/logger/httpd" in records[1].value
+    assert "/compaction_manager/compactions" in records[2].value
+    assert "name" in records[3].error
+    assert records[4].error == "Could not find module 'no_such_module'"
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from scylla_api_client.api import ScyllaApi
+from scylla_api_client.cli import create_parser
+from scylla_api_client import completion
+
+
+@pytest.fixture(scope="module")
+def index_path(api_server, tmp_path_factory):
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    scylla_api.load()
+    path = str(tmp_path_factory.mktemp("completion") / "completion.json")
+    script = completion.generate(scylla_api, create_parser(), "bash", path)
+    assert "complete -o default -F _scylla_api_client scylla-api-client" in script
+    assert path in script
+    return path
+
+
+@pytest.fixture(scope="module")
+def index(index_path):
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def test_complete_names(index):
+    assert completion.complete(index, [], "") == ["system", "compaction_manager", "error_injection", "v2"]
+    assert completion.complete(index, [], "system/log") == ["system/logger", "system/logger/{name}"]
+    assert completion.complete(index, ["-p", "10000", "system"], "up") == ["uptime_ms"]
+    assert "--port" in completion.complete(index, [], "--p")
+
+
+def test_complete_methods_options_and_values(index):
+    assert completion.complete(index, ["system/logger/{name}"], "") == ["GET", "POST"]
+    assert completion.complete(index, ["system/logger/{name}", "POST", "--name", "httpd"], "--") == ["--level"]
+    assert completion.complete(index, ["system", "logger/{name}", "POST", "--level"], "d") == ["debug"]
+    assert completion.complete(index, ["no_such/command"], "") == []
+
+
+def test_complete_main(index_path, capsys):
+    assert completion.complete_main([index_path, "system", "upt"]) == 0
+    assert capsys.readouterr().out == "uptime_ms\n"
+    assert completion.complete_main([index_path + ".missing", ""]) == 1
+
+
+def test_unsupported_shell(api_server, tmp_path):
+    with pytest.raises(ValueError):
+        completion.generate(ScyllaApi(api_server.host, api_server.port), create_parser(), "tcsh", str(tmp_path / "c.json"))
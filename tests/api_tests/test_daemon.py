@@ -0,0 +1,112 @@
+import io
+import os
+import sys
+from threading import Thread
+
+import pytest
+
+from scylla_api_client.daemon import Daemon
+from scylla_api_client.daemon_client import forward, reads_stdin, send_request
+from scylla_api_client.rest import resilience
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = Daemon(str(tmp_path / "daemon.sock"))
+    thread = Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    daemon.server_close()
+
+
+def run(daemon, api_server, *argv):
+    return send_request({"argv": ["-p", str(api_server.port), "--no-schema-cache", *argv]}, daemon.socket_path)
+
+
+def test_daemon_runs_commands(daemon, api_server):
+    res = run(daemon, api_server, "system/logger/{name}", "GET", "--name", "httpd")
+    assert res["exit"] == 0
+    assert "/system/logger/httpd" in res["stdout"]
+
+    res = run(daemon, api_server, "system/no_such_command")
+    assert res["exit"] == 1
+    assert res["stdout"].strip() == "Could not find command 'no_such_command' in module 'system'"
+
+
+def test_daemon_reuses_loaded_api(daemon, api_server):
+    run(daemon, api_server, "system/uptime_ms")
+    scylla_api = daemon.api_cache.load_api("localhost", api_server.port)
+    res = run(daemon, api_server, "system/uptime_ms")
+    assert res["exit"] == 0
+    assert daemon.api_cache.load_api("localhost", api_server.port) is scylla_api
+
+
+def test_daemon_applies_timeouts_per_invocation(daemon, api_server):
+    run(daemon, api_server, "system/uptime_ms")
+    scylla_api = daemon.api_cache.load_api("localhost", api_server.port)
+    run(daemon, api_server, "--read-timeout", "7", "--retries", "0", "system/uptime_ms")
+    assert scylla_api.client.timeouts.read == 7
+    assert scylla_api.client.retry_policy.retries == 0
+    run(daemon, api_server, "system/uptime_ms")
+    assert scylla_api.client.timeouts.read == resilience.DEFAULT_READ_TIMEOUT
+    assert scylla_api.client.retry_policy.retries == resilience.DEFAULT_RETRIES
+
+
+def test_no_daemon(tmp_path):
+    assert send_request({"ping": True}, str(tmp_path / "none.sock")) is None
+
+
+@pytest.mark.parametrize("option", [["-w", "1"], ["--watch", "1"], ["--watch=1"], ["--record", "x.rec"],
+                                    ["--exporter", "9100"]])
+def test_long_running_commands_run_locally(daemon, api_server, option):
+    argv = ["-p", str(api_server.port), "--no-schema-cache", "system/uptime_ms", *option]
+    assert forward(argv, daemon.socket_path) is None
+    assert forward(argv[:-len(option)], daemon.socket_path) == 0
+
+
+def test_untrusted_socket_is_not_used(daemon, api_server):
+    os.chmod(daemon.socket_path, 0o666)
+    assert send_request({"ping": True}, daemon.socket_path) is None
+    os.chmod(daemon.socket_path, 0o600)
+    assert send_request({"ping": True}, daemon.socket_path) == {"exit": 0}
+
+
+def test_non_socket_is_not_used(tmp_path):
+    path = tmp_path / "daemon.sock"
+    path.write_text("")
+    path.chmod(0o600)
+    assert send_request({"ping": True}, str(path)) is None
+
+
+class UnreadStdin:
+    def isatty(self):
+        return False
+
+    def read(self):
+        raise AssertionError("stdin is read")
+
+
+@pytest.mark.parametrize("argv,expected", [(["-b"], True), (["-b", "-"], True), (["--batch=-"], True),
+                                           (["-b", "-p", "10000"], True), (["-b", "cmds.txt"], False),
+                                           (["--batch=cmds.txt"], False), (["system/uptime_ms"], False)])
+def test_reads_stdin(argv, expected):
+    assert reads_stdin(argv) == expected
+
+
+def test_batch_file_leaves_stdin_alone(daemon, api_server, tmp_path, monkeypatch, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("system/uptime_ms\n")
+    monkeypatch.setattr(sys, "stdin", UnreadStdin())
+    argv = ["-p", str(api_server.port), "--no-schema-cache", "-b", str(path)]
+    assert forward(argv, daemon.socket_path) == 0
+    assert "/system/uptime_ms" in capsys.readouterr().out
+    # without a daemon, the batch runs in-process and stdin is left to it
+    assert forward(["--batch=-"], str(tmp_path / "none.sock")) is None
+
+
+def test_batch_stdin_through_daemon(daemon, api_server, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("system/uptime_ms\n"))
+    argv = ["-p", str(api_server.port), "--no-schema-cache", "--batch=-"]
+    assert forward(argv, daemon.socket_path) == 0
+    assert "/system/uptime_ms" in capsys.readouterr().out
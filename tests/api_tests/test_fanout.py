@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from scylla_api_client.api import MissingArgumentError
+from scylla_api_client import fanout
+
+
+def test_parse_nodes():
+    assert fanout.parse_nodes("10.0.0.1,10.0.0.2 10.0.0.3") == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+def test_read_nodes_file(tmp_path):
+    path = tmp_path / "nodes"
+    path.write_text("# cluster\n10.0.0.1\n\n10.0.0.2  # rack2\n")
+    assert fanout.read_nodes_file(str(path)) == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_fan_out(api_server, scylla_api_obj):
+    command = scylla_api_obj.modules["system"].commands["logger/{name}"]
+    method, args = command.parse_invocation(["GET", "--name", "httpd"])
+    nodes = ["localhost", "127.0.0.1", "localhost"]
+    results = fanout.fan_out(method, command.name_format, args, nodes, api_server.port, max_concurrency=2)
+
+    assert list(results.keys()) == ["localhost", "127.0.0.1"]
+    assert all(result.ok for result in results.items())
+    assert "/system/logger/httpd" in results["127.0.0.1"].value
+    assert list(json.loads(fanout.format_json(results)).keys()) == ["localhost", "127.0.0.1"]
+    assert fanout.format_table(results).splitlines()[0].split() == ["NODE", "RESULT"]
+
+
+def test_fan_out_missing_path_argument(api_server, scylla_api_obj):
+    command = scylla_api_obj.modules["system"].commands["logger/{name}"]
+    method = command.methods[command.Method.GET]
+    with pytest.raises(MissingArgumentError):
+        fanout.fan_out(method, command.name_format, {}, ["localhost"], api_server.port)
@@ -0,0 +1,90 @@
+import io
+import time
+
+import pytest
+
+from scylla_api_client.api import ScyllaApi
+from scylla_api_client.rest.response_cache import ResponseCache, parse_ttls
+
+
+def counting_api(api_server, **cache_args):
+    scylla_api = ScyllaApi(api_server.host, api_server.port, response_cache=ResponseCache(**cache_args))
+    scylla_api.load()
+    scylla_api.load_all()
+    fetched = []
+    get = scylla_api.client.get
+
+    def counting_get(resource_path, **kwargs):
+        fetched.append(resource_path)
+        return get(resource_path, **kwargs)
+    scylla_api.client.get = counting_get
+    return scylla_api, fetched
+
+
+def dispatch(scylla_api, kind, resource_path, **kwargs):
+    return scylla_api.client.dispatch_rest_method(rest_method_kind=kind, resource_path=resource_path, **kwargs)
+
+
+def test_get_served_from_cache(api_server):
+    scylla_api, fetched = counting_api(api_server)
+    command = scylla_api.modules["system"].commands["logger/{name}"]
+    outputs = []
+    for _ in range(2):
+        out = io.BytesIO()
+        command.invoke(scylla_api.host, scylla_api.port, ["GET", "--name", "httpd"], out=out)
+        outputs.append(out.getvalue())
+    assert fetched == ["/system/logger/httpd"]
+    assert outputs[0] == outputs[1] and b"/system/logger/httpd" in outputs[0]
+    cache = scylla_api.client.response_cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_query_params_in_key(api_server):
+    scylla_api, fetched = counting_api(api_server)
+    dispatch(scylla_api, "GET", "/system/logger", query_params={"a": "1"})
+    dispatch(scylla_api, "GET", "/system/logger", query_params={"a": "2"})
+    dispatch(scylla_api, "GET", "/system/logger", query_params={"a": "1"})
+    assert len(fetched) == 2
+
+
+def test_post_invalidates_module(api_server):
+    scylla_api, fetched = counting_api(api_server)
+    dispatch(scylla_api, "GET", "/system/logger")
+    dispatch(scylla_api, "GET", "/compaction_manager/compactions")
+    dispatch(scylla_api, "POST", "/system/logger/httpd")
+    dispatch(scylla_api, "GET", "/system/logger")
+    dispatch(scylla_api, "GET", "/compaction_manager/compactions")
+    assert fetched == ["/system/logger", "/compaction_manager/compactions", "/system/logger"]
+    assert scylla_api.client.response_cache.invalidations == 1
+
+
+def test_ttls_and_bypass(api_server):
+    scylla_api, fetched = counting_api(api_server, default_ttl=0.1, ttls={"/system/uptime_ms": 0})
+    for _ in range(2):
+        dispatch(scylla_api, "GET", "/system/uptime_ms")
+    assert len(fetched) == 2
+    dispatch(scylla_api, "GET", "/system/logger")
+    dispatch(scylla_api, "GET", "/system/logger", use_cache=False)
+    assert len(fetched) == 4
+    time.sleep(0.15)
+    dispatch(scylla_api, "GET", "/system/logger")
+    assert len(fetched) == 5
+
+
+def test_lru_eviction(api_server):
+    scylla_api, fetched = counting_api(api_server, max_entries=2)
+    for path in ["/system/a", "/system/b", "/system/a", "/system/c", "/system/a", "/system/b"]:
+        dispatch(scylla_api, "GET", path)
+    assert fetched == ["/system/a", "/system/b", "/system/c", "/system/b"]
+    cache = scylla_api.client.response_cache
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 4, "evictions": 2, "invalidations": 0}
+
+
+def test_parse_ttls():
+    assert parse_ttls("10,storage_service/host_id=60") == (10.0, {"/storage_service/host_id": 60.0})
+    cache = ResponseCache(default_ttl=1, ttls={"/storage_service": 30, "/storage_service/host_id": 60})
+    assert cache.ttl("/storage_service/host_id") == 60
+    assert cache.ttl("/storage_service/keyspaces") == 30
+    assert cache.ttl("/gossiper/endpoint/live") == 1
+    with pytest.raises(ValueError):
+        parse_ttls("x=-1")
@@ -0,0 +1,146 @@
+import gzip
+from http.server import HTTPServer
+from threading import Thread
+
+import pytest
+from conftest import ScyllaAPIBasicRequestHandler
+
+from scylla_api_client.api import ScyllaApi
+from scylla_api_client.schema_cache import SchemaCache
+
+
+@pytest.fixture
+def schema_cache(tmp_path):
+    return SchemaCache(str(tmp_path))
+
+
+def test_load_stores_schema(api_server, schema_cache):
+    scylla_api = ScyllaApi(api_server.host, api_server.port, schema_cache=schema_cache)
+    scylla_api.load()
+
+    version = scylla_api.client.get_release_version()
+    schema = schema_cache.get(api_server.host, api_server.port, version)
+    assert [m["name"] for m in schema["modules"]] == list(scylla_api.modules.keys())
+    assert "apis" not in schema["modules"][0]
+
+    scylla_api.modules["system"].commands
+    schema = schema_cache.get(api_server.host, api_server.port, version)
+    assert [c["path"] for c in schema["modules"][0]["apis"]] == ["logger", "drop_sstable_caches", "uptime_ms", "logger/{name}"]
+
+
+def test_load_from_cache(api_server, schema_cache):
+    scylla_api = ScyllaApi(api_server.host, api_server.port, schema_cache=schema_cache)
+    scylla_api.load()
+    scylla_api.load_all()
+
+    scylla_api = ScyllaApi(api_server.host, api_server.port, schema_cache=schema_cache)
+    def fail_fetch(*args):
+        raise AssertionError("schema should have been served from the cache")
+    scylla_api.fetch_index = fail_fetch
+    scylla_api.fetch_module_apis = fail_fetch
+    scylla_api.load()
+
+    assert list(scylla_api.modules.keys()) == ["system", "compaction_manager", "error_injection", "v2"]
+    assert list(scylla_api.modules["system"].commands.keys()) == ["logger", "drop_sstable_caches", "uptime_ms", "logger/{name}"]
+
+
+def test_stale_version_is_refetched(api_server, schema_cache):
+    schema_cache.put(api_server.host, api_server.port, "0.0.0", {"modules": []})
+
+    scylla_api = ScyllaApi(api_server.host, api_server.port, schema_cache=schema_cache)
+    scylla_api.load()
+    assert len(scylla_api.modules) == 4
+
+
+def test_refresh_schema(api_server, schema_cache):
+    version = ScyllaApi(api_server.host, api_server.port).client.get_release_version()
+    schema_cache.put(api_server.host, api_server.port, version, {"modules": []})
+
+    scylla_api = ScyllaApi(api_server.host, api_server.port, schema_cache=schema_cache)
+    scylla_api.load(refresh_schema=True)
+    assert len(scylla_api.modules) == 4
+    assert len(schema_cache.get(api_server.host, api_server.port, version)["modules"]) == 4
+
+
+class RevalidatingRequestHandler(ScyllaAPIBasicRequestHandler):
+    """Serves the api documents gzip compressed, with an ETag, answering 304 to a matching If-None-Match"""
+    def do_GET(self):
+        if not self.path.startswith("/api-doc") and self.path != "/v2":
+            return super().do_GET()
+        etag = f'"{self.server.generation}-{self.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified.append(self.path)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.server.sent.append(self.path)
+        self.etag = etag
+        super().do_GET()
+
+    def _send_response(self, content):
+        if getattr(self, "etag", None) and "gzip" in self.headers.get("Accept-Encoding", ""):
+            content = gzip.compress(content)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", f"{len(content)}")
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(content)
+        else:
+            super()._send_response(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def revalidating_server():
+    server = HTTPServer(("localhost", 0), RevalidatingRequestHandler)
+    server.generation = 1
+    server.sent = []
+    server.not_modified = []
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_compressed_documents_are_validated(revalidating_server, schema_cache):
+    port = revalidating_server.server_address[1]
+    scylla_api = ScyllaApi("localhost", port, schema_cache=schema_cache)
+    scylla_api.load()
+    scylla_api.load_all()
+    assert sorted(revalidating_server.sent) == ["/api-doc", "/api-doc/compaction_manager/", "/api-doc/error_injection/",
+                                                "/api-doc/system/", "/v2"]
+    entry = schema_cache.get_entry("localhost", port)
+    assert entry["schema"]["validators"] == {"etag": '"1-/api-doc"'}
+    assert entry["schema"]["modules"][0]["validators"] == {"etag": '"1-/api-doc/system/"'}
+
+
+def test_new_version_revalidates_documents(revalidating_server, schema_cache):
+    port = revalidating_server.server_address[1]
+    scylla_api = ScyllaApi("localhost", port, schema_cache=schema_cache)
+    scylla_api.load()
+    scylla_api.load_all()
+    entry = schema_cache.get_entry("localhost", port)
+    # as if the node was upgraded since the schema was cached
+    schema_cache.put("localhost", port, "0.0.0", entry["schema"])
+    revalidating_server.sent.clear()
+
+    scylla_api = ScyllaApi("localhost", port, schema_cache=schema_cache)
+    scylla_api.load()
+    scylla_api.load_all()
+    assert revalidating_server.sent == []
+    assert len(revalidating_server.not_modified) == 5
+    assert list(scylla_api.modules["system"].commands.keys()) == ["logger", "drop_sstable_caches", "uptime_ms", "logger/{name}"]
+    assert schema_cache.get("localhost", port, entry["version"]) is not None
+
+    # only the changed documents are fetched again
+    revalidating_server.generation = 2
+    schema_cache.put("localhost", port, "0.0.0", entry["schema"])
+    scylla_api = ScyllaApi("localhost", port, schema_cache=schema_cache)
+    scylla_api.load()
+    scylla_api.modules["system"].commands
+    assert revalidating_server.sent == ["/api-doc", "/api-doc/system/"]
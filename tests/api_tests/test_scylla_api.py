@@ -3,13 +3,6 @@ import pytest
 from scylla_api_client.api import ScyllaApi
 
 
-@pytest.fixture(scope="module")
-def scylla_api_obj(api_server):
-    scylla_api = ScyllaApi(api_server.host, api_server.port)
-    scylla_api.load()
-    return scylla_api
-
-
 def test_number_of_scylla_api_modules(scylla_api_obj):
     assert len(scylla_api_obj.modules) == 4
 
@@ -43,3 +36,119 @@ def test_command_parameters(scylla_api_obj):
     current_command = current_module.commands["compactions"]
     assert current_command.name == command
 
+
+
+def test_lazy_module_loading(api_server):
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    fetched = []
+    fetch_module_apis = scylla_api.fetch_module_apis
+    def fetch(module_schema):
+        fetched.append(module_schema["name"])
+        return fetch_module_apis(module_schema)
+    scylla_api.fetch_module_apis = fetch
+    scylla_api.load()
+
+    assert list(scylla_api.modules.keys()) == ["system", "compaction_manager", "error_injection", "v2"]
+    assert not fetched
+    assert "uptime_ms" in scylla_api.modules["system"].commands.keys()
+    assert fetched == ["system"]
+    scylla_api.modules["system"].commands["logger"]
+    assert fetched == ["system"]
+
+
+def test_load_all_fetches_concurrently(api_server):
+    import threading
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    threads = set()
+    fetch_module_apis = scylla_api.fetch_module_apis
+    def fetch(module_schema):
+        threads.add(threading.current_thread().name)
+        return fetch_module_apis(module_schema)
+    scylla_api.fetch_module_apis = fetch
+    scylla_api.load()
+    scylla_api.load_all(max_workers=4)
+
+    assert threading.current_thread().name not in threads
+    assert list(scylla_api.modules.keys()) == ["system", "compaction_manager", "error_injection", "v2"]
+    assert all(module.loaded for module in scylla_api.modules.items())
+    assert list(scylla_api.modules["v2"].commands.keys()) == [
+        "metrics-config", "config/background_writer_scheduling_quota", "config/log_to_syslog"]
+
+
+def test_invoke_streams_response(scylla_api_obj, capsys):
+    import io
+    command = scylla_api_obj.modules["system"].commands["logger/{name}"]
+    out = io.BytesIO()
+    command.invoke(scylla_api_obj.host, scylla_api_obj.port, ["GET", "--name", "httpd"], out=out)
+    assert "/system/logger/httpd" in out.getvalue().decode()
+    assert capsys.readouterr().out == ""
+
+    command.invoke(scylla_api_obj.host, scylla_api_obj.port, ["GET", "--name", "httpd"], json_stream=True)
+    assert "/system/logger/httpd" in capsys.readouterr().out
+
+
+def test_find_command(scylla_api_obj):
+    from scylla_api_client.api import CommandNotFoundError
+    command, argv = scylla_api_obj.find_command(["uptime_ms", "GET"])
+    assert (command.module_name, command.name, argv) == ("system", "uptime_ms", ["GET"])
+    command, argv = scylla_api_obj.find_command(["/system", "logger/{name}/", "--name", "x"])
+    assert (command.module_name, command.name, argv) == ("system", "logger/{name}", ["--name", "x"])
+    assert scylla_api_obj.find_command(["compaction_manager/compactions"])[0].name == "compactions"
+    with pytest.raises(CommandNotFoundError, match="Did you mean: uptime_ms"):
+        scylla_api_obj.find_command(["uptime"])
+    with pytest.raises(CommandNotFoundError, match="Did you mean: system"):
+        scylla_api_obj.find_command(["sytem/uptime_ms"])
+
+
+def test_call_returns_data(scylla_api_obj, capsys):
+    assert "/system/logger/httpd" in scylla_api_obj.call("system/logger/{name}", name="httpd")
+    raw = scylla_api_obj.call("uptime_ms", raw=True)
+    assert isinstance(raw, bytes) and b"/system/uptime_ms" in raw
+    assert capsys.readouterr().out == ""
+
+
+def test_call_errors(scylla_api_obj):
+    from scylla_api_client.api import CommandNotFoundError, MissingArgumentError, ScyllaApiError
+    with pytest.raises(CommandNotFoundError):
+        scylla_api_obj.call("system/no_such_command")
+    with pytest.raises(MissingArgumentError):
+        scylla_api_obj.call("system/logger/{name}")
+    with pytest.raises(MissingArgumentError):
+        scylla_api_obj.call("system/logger", "POST")
+    with pytest.raises(ScyllaApiError, match="unknown option"):
+        scylla_api_obj.call("system/logger/{name}", name="httpd", nmae="x")
+    with pytest.raises(ScyllaApiError, match="DELETE method is not supported"):
+        scylla_api_obj.call("system/uptime_ms", "DELETE")
+
+
+def test_call_raises_on_error_status(error_server):
+    from scylla_api_client.api import ApiResponseError, NodeConnectionError
+    scylla_api = ScyllaApi("localhost", error_server.server_address[1])
+    scylla_api.load()
+    scylla_api.client.retry_policy.retries = 0
+    with pytest.raises(ApiResponseError, match="Not ready") as e:
+        scylla_api.call("system/uptime_ms")
+    assert e.value.status_code == 503
+    assert e.value.body == {"message": "Not ready", "code": 503}
+    error_server.shutdown()
+    error_server.server_close()
+    with pytest.raises(NodeConnectionError):
+        scylla_api.call("system/uptime_ms")
+
+
+def test_client_timeouts_and_retries(api_server):
+    from scylla_api_client.rest.resilience import RetryPolicy, Timeouts
+    timeouts = Timeouts(connect=1, read=2)
+    retry_policy = RetryPolicy(retries=0)
+    scylla_api = ScyllaApi(api_server.host, api_server.port, timeouts=timeouts, retry_policy=retry_policy)
+    assert scylla_api.client.timeouts is timeouts
+    assert scylla_api.client.retry_policy is retry_policy
+
+
+def test_concurrent_calls_on_fresh_api(api_server):
+    from concurrent.futures import ThreadPoolExecutor
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    scylla_api.load()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: scylla_api.call("system/uptime_ms"), range(8)))
+    assert all("/system/uptime_ms" in result for result in results)
@@ -0,0 +1,40 @@
+import pytest
+
+from scylla_api_client.api import ScyllaApi
+from scylla_api_client.shell import ApiShell
+
+
+@pytest.fixture(scope="module")
+def shell(api_server):
+    scylla_api = ScyllaApi(api_server.host, api_server.port)
+    scylla_api.load()
+    return ApiShell(scylla_api)
+
+
+def test_complete_command_names(shell):
+    assert "system/" in shell.completenames("sys")
+    assert shell.completenames("system/log") == ["system/logger", "system/logger/{name}"]
+    assert "list" in shell.completenames("li")
+
+
+def test_complete_methods_and_options(shell):
+    line = "system/logger/{name} "
+    assert shell.completedefault("", line, len(line), len(line)) == ["GET", "POST"]
+    line = "system/logger/{name} POST --name httpd --"
+    assert shell.completedefault("--", line, len(line) - 2, len(line)) == ["--level"]
+    line = "system log"
+    assert shell.completedefault("log", line, len(line) - 3, len(line)) == ["logger", "logger/{name}"]
+
+
+def test_run_command(shell, capsys):
+    shell.onecmd("system/logger/{name} GET --name httpd")
+    assert "/system/logger/httpd" in capsys.readouterr().out
+    shell.onecmd("system/no_such_command")
+    assert capsys.readouterr().out.strip() == "Could not find command 'no_such_command' in module 'system'"
+
+
+def test_connect(shell, api_server):
+    shell.onecmd(f"connect 127.0.0.1 {api_server.port}")
+    assert shell.scylla_api.host == "127.0.0.1"
+    assert shell.prompt == f"127.0.0.1:{api_server.port}> "
+    assert list(shell.scylla_api.modules.keys()) == ["system", "compaction_manager", "error_injection", "v2"]
@@ -0,0 +1,31 @@
+from scylla_api_client.api import ScyllaApiCommand
+from scylla_api_client.command_index import CommandIndex
+
+
+def make_index():
+    index = CommandIndex()
+    for module_name, command_name in [("system", "logger"), ("system", "logger/{name}"),
+                                      ("system", "uptime_ms"), ("storage_service", "logger")]:
+        index.add(module_name, ScyllaApiCommand(module_name=module_name, command_name=command_name,
+                                                host="localhost", port="10000"))
+    return index
+
+
+def test_lookup():
+    index = make_index()
+    assert [c.module_name for c in index.lookup("logger")] == ["system", "storage_service"]
+    assert [c.name for c in index.lookup("uptime_ms")] == ["uptime_ms"]
+    assert index.lookup("uptime") == []
+
+
+def test_complete():
+    index = make_index()
+    assert index.complete("log") == ["logger", "logger/{name}"]
+    assert index.complete("system/l") == ["system/logger", "system/logger/{name}"]
+    assert index.complete("x") == []
+
+
+def test_suggest():
+    index = make_index()
+    assert index.suggest("upt") == ["uptime_ms"]
+    assert index.suggest("uptimes_ms") == ["uptime_ms"]
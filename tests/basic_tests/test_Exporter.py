@@ -0,0 +1,121 @@
+import threading
+import time
+import urllib.request
+
+from scylla_api_client.exporter import Exporter, metric_name, samples, serve
+from scylla_api_client.exporter_server import ExporterServer
+
+
+class Response:
+    def __init__(self, value, status_code=200):
+        self.value = value
+        self.status_code = status_code
+
+    def json(self):
+        return self.value
+
+
+class FakeClient:
+    """Returns fixed results, counting the requests"""
+    def __init__(self, results, delay=0.0):
+        self.results = results
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, resource_path, query_params=None):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.delay)
+        return self.results.get(resource_path, Response("not found", status_code=404))
+
+
+METRICS = {
+    'storage_service/load': ('/storage_service/load', {}),
+    'storage_service/ownership': ('/storage_service/ownership/', {}),
+    'system/logger': ('/system/logger', {}),
+}
+
+RESULTS = {
+    '/storage_service/load': Response(1234.5),
+    '/storage_service/ownership/': Response([{"key": "127.0.0.1", "value": 0.5}]),
+}
+
+
+def test_metric_name():
+    assert metric_name('storage_service/load') == 'scylla_api_storage_service_load'
+    assert metric_name('/cache_service/metrics/row/hits/') == 'scylla_api_cache_service_metrics_row_hits'
+
+
+def test_samples():
+    assert samples(3) == [('', 3)]
+    assert samples([1, 2]) == [('index="0"', 1), ('index="1"', 2)]
+    assert samples([{"key": 'a"b', "value": 7}]) == [('key="a\\"b"', 7)]
+    assert samples("text") == []
+    assert samples(True) == []
+
+
+def test_render():
+    text = Exporter(FakeClient(RESULTS), METRICS).render()
+    lines = text.splitlines()
+    assert 'scylla_api_request_success{command="storage_service/load"} 1' in lines
+    assert 'scylla_api_request_success{command="system/logger"} 0' in lines
+    assert '# TYPE scylla_api_storage_service_load gauge' in lines
+    assert 'scylla_api_storage_service_load 1234.5' in lines
+    assert 'scylla_api_storage_service_ownership{key="127.0.0.1"} 0.5' in lines
+    assert 'scylla_api_system_logger' not in text
+
+
+def test_ttl_cache():
+    client = FakeClient(RESULTS)
+    exporter = Exporter(client, METRICS, ttl=0.2)
+    exporter.render()
+    exporter.render()
+    assert client.requests == len(METRICS)
+    time.sleep(0.25)
+    exporter.render()
+    assert client.requests == 2 * len(METRICS)
+    assert exporter.refreshes == 2
+
+
+def test_concurrent_scrapes_coalesce():
+    client = FakeClient(RESULTS, delay=0.05)
+    exporter = Exporter(client, METRICS, ttl=60)
+    server = ExporterServer(('127.0.0.1', 0), exporter)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    bodies = []
+
+    def scrape():
+        with urllib.request.urlopen(url) as res:
+            bodies.append(res.read())
+
+    try:
+        scrapers = [threading.Thread(target=scrape) for _ in range(8)]
+        for t in scrapers:
+            t.start()
+        for t in scrapers:
+            t.join()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(bodies) == 8
+    assert len(set(bodies)) == 1
+    assert client.requests == len(METRICS)
+
+
+def test_serve_outside_main_thread(monkeypatch):
+    # as when run by a daemon request handler thread
+    monkeypatch.setattr(ExporterServer, "serve_forever", lambda self: None)
+    errors = []
+
+    def run():
+        try:
+            serve(Exporter(FakeClient({}), {}), ("127.0.0.1", 0))
+        except Exception as e:
+            errors.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert errors == []
@@ -1,3 +1,5 @@
+import pytest
+
 from scylla_api_client.api import OrderedDict
 
 
@@ -53,3 +55,43 @@ def test_interator():
     for i, key in enumerate(it):
         assert key == f"k{i}"
         assert d[key] == f"v{i}"
+
+
+def test_iterator_yields_all_keys():
+    d = OrderedDict()
+    for i in range(5):
+        d.insert(f"k{i}", f"v{i}")
+    assert list(d) == [f"k{i}" for i in range(5)]
+
+
+def test_nested_iteration():
+    d = OrderedDict()
+    for i in range(3):
+        d.insert(f"k{i}", f"v{i}")
+    pairs = [(k1, k2) for k1 in d for k2 in d]
+    assert len(pairs) == 9
+
+
+def test_insert_existing_key():
+    d = OrderedDict()
+    d.insert("k1", "v1")
+    d.insert("k2", "v2")
+    d.insert("k1", "v3")
+
+    assert len(d) == 2
+    assert list(d.keys()) == ["k1", "k2"]
+    assert d[0] == "v3"
+
+
+def test_contains_and_index_range():
+    d = OrderedDict()
+    d.insert("k", "v")
+
+    assert "k" in d
+    assert "x" not in d
+    with pytest.raises(IndexError):
+        d[1]
+    with pytest.raises(IndexError):
+        d[-1]
+    with pytest.raises(KeyError):
+        d["x"]
@@ -0,0 +1,127 @@
+import io
+import math
+
+import pytest
+
+from scylla_api_client.recorder import Recorder, RecordingReader, RecordingWriter
+
+
+class Response:
+    def __init__(self, value, status_code=200):
+        self.value = value
+        self.status_code = status_code
+
+    def json(self):
+        return self.value
+
+
+class FakeClient:
+    """Replays the values of each resource path"""
+    def __init__(self, values):
+        self.values = {path: list(v) for path, v in values.items()}
+
+    def get(self, resource_path, query_params=None):
+        return Response(self.values[resource_path].pop(0))
+
+
+def write_samples(path, count, block_rows=4):
+    with RecordingWriter(path, ['a', 'b'], block_rows=block_rows) as writer:
+        for i in range(count):
+            writer.append(100.0 + i, [float(i), float(i * 2)])
+
+
+def test_round_trip_partial_block(tmp_path):
+    path = str(tmp_path / "rec")
+    write_samples(path, 10)
+    with RecordingReader(path) as reader:
+        assert reader.columns == ['timestamp', 'a', 'b']
+        assert reader.blocks == 3
+        assert len(reader) == 10
+        data = reader.read()
+    assert list(data['timestamp']) == [100.0 + i for i in range(10)]
+    assert list(data['b']) == [float(i * 2) for i in range(10)]
+
+
+def test_read_range(tmp_path):
+    path = str(tmp_path / "rec")
+    write_samples(path, 10)
+    with RecordingReader(path) as reader:
+        assert list(reader.read(start=103, end=106)['a']) == [3.0, 4.0, 5.0, 6.0]
+        assert list(reader.read(start=108.5)['a']) == [9.0]
+        assert list(reader.read(end=99)['a']) == []
+
+
+def test_append_to_existing(tmp_path):
+    path = str(tmp_path / "rec")
+    write_samples(path, 3)
+    with RecordingWriter(path, ['a', 'b']) as writer:
+        assert writer.block_rows == 4
+        writer.append(200.0, [7.0, 8.0])
+    with RecordingReader(path) as reader:
+        assert list(reader.read()['a']) == [0.0, 1.0, 2.0, 7.0]
+    with pytest.raises(ValueError):
+        RecordingWriter(path, ['c'])
+
+
+def test_to_csv(tmp_path):
+    path = str(tmp_path / "rec")
+    with RecordingWriter(path, ['a']) as writer:
+        writer.append(1.5, [3.0])
+        writer.append(2.5, [math.nan])
+    out = io.StringIO()
+    with RecordingReader(path) as reader:
+        reader.to_csv(out)
+    assert out.getvalue().splitlines() == ['timestamp,a', '1.5,3.0', '2.5,']
+
+
+def test_recorder(tmp_path):
+    path = str(tmp_path / "rec")
+    client = FakeClient({'/x': [1, 2, 3], '/y': [True, {"a": 1}, 4.5]})
+    metrics = {'x': ('/x', {}), 'y': ('/y', {})}
+    with RecordingWriter(path, metrics.keys()) as writer:
+        Recorder(client, metrics, writer).run(interval=0.01, count=3)
+    with RecordingReader(path) as reader:
+        data = reader.read()
+    assert list(data['x']) == [1.0, 2.0, 3.0]
+    assert [v for v in data['y'] if not math.isnan(v)] == [4.5]
+    assert list(data['timestamp']) == sorted(data['timestamp'])
+
+
+def test_partial_block_is_written_in_place(tmp_path):
+    path = str(tmp_path / "rec")
+    writer = RecordingWriter(path, ['a'], block_rows=4, flush_interval=0)
+    for i in range(6):
+        writer.append(100.0 + i, [float(i)])
+    # readable without closing the writer, as after a crash
+    with RecordingReader(path) as reader:
+        assert reader.blocks == 2
+        assert list(reader.read()['a']) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    writer.close()
+
+    # reopening continues the partial block
+    with RecordingWriter(path, ['a'], block_rows=4) as writer:
+        writer.append(106.0, [6.0])
+    with RecordingReader(path) as reader:
+        assert reader.blocks == 2
+        assert list(reader.read()['a']) == [float(i) for i in range(7)]
+
+
+def test_recorder_stops_on_sigterm(tmp_path):
+    import os
+    import signal
+    path = str(tmp_path / "rec")
+    client = FakeClient({'/x': [1, 2, 3]})
+    metrics = {'x': ('/x', {})}
+    previous_handler = signal.getsignal(signal.SIGTERM)
+
+    def get(resource_path, query_params=None):
+        # the third request is interrupted
+        if len(client.values['/x']) == 1:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return FakeClient.get(client, resource_path, query_params)
+    client.get = get
+    with RecordingWriter(path, metrics.keys(), flush_interval=60) as writer:
+        Recorder(client, metrics, writer).run(interval=0.01)
+        with RecordingReader(path) as reader:
+            assert list(reader.read()['x']) == [1.0, 2.0]
+    assert signal.getsignal(signal.SIGTERM) is previous_handler
@@ -0,0 +1,140 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from scylla_api_client.rest import CircuitOpenError, RestClient
+from scylla_api_client.rest.resilience import CircuitBreaker, RetryPolicy, Timeouts
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first server.failures requests, then 200, after server.delay seconds"""
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        status = 503 if self.server.requests <= self.server.failures else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"42")
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    server = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    server.requests = 0
+    server.failures = 0
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client(port, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(retries=2, backoff=0.01))
+    kwargs.setdefault("circuit_breaker", CircuitBreaker("test", failure_threshold=3, reset_timeout=0.2))
+    return RestClient(host="127.0.0.1", port=port, **kwargs)
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_timeouts():
+    timeouts = Timeouts(connect=1, read=2)
+    assert timeouts.get("GET") == (1, 2)
+    assert timeouts.get("POST") == (1, None)
+
+
+def test_retry_delay_bounds():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3)
+    assert all(0 <= policy.delay(0) <= 0.1 for _ in range(20))
+    assert all(0 <= policy.delay(5) <= 0.3 for _ in range(20))
+
+
+def test_get_retries_unavailable(flaky_server):
+    flaky_server.failures = 2
+    res = client(flaky_server.server_port).get("/x")
+    assert res.status_code == 200
+    assert flaky_server.requests == 3
+
+
+def test_post_is_not_retried(flaky_server):
+    flaky_server.failures = 1
+    assert client(flaky_server.server_port).post("/x").status_code == 503
+    assert flaky_server.requests == 1
+
+
+def test_read_timeout_bounded(flaky_server):
+    flaky_server.delay = 0.5
+    start = time.monotonic()
+    res = client(flaky_server.server_port, timeouts=Timeouts(read=0.1), retry_policy=RetryPolicy(retries=1, backoff=0.01)).get("/x")
+    assert res is None
+    assert time.monotonic() - start < 1.0
+
+
+def test_circuit_breaker_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.2)
+    c = client(closed_port(), circuit_breaker=breaker, retry_policy=RetryPolicy(retries=0))
+    for _ in range(3):
+        assert c.get("/x") is None
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        c.post("/x")
+    assert breaker.failures == 3
+
+
+def test_circuit_breaker_half_open():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.1)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.15)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # a single trial request is let through
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+class BadGzipHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"42")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_circuit_breaker_trial_raising_other_errors():
+    from requests.exceptions import ContentDecodingError
+    server = HTTPServer(("127.0.0.1", 0), BadGzipHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.1)
+        breaker.record_failure()
+        time.sleep(0.15)
+        c = client(server.server_address[1], circuit_breaker=breaker, retry_policy=RetryPolicy(retries=0))
+        with pytest.raises(ContentDecodingError):
+            c.get("/x")
+        # the failed trial opens the breaker again, and a new trial follows the reset timeout
+        assert breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.15)
+        assert breaker.allow_request()
+    finally:
+        server.shutdown()
+        server.server_close()
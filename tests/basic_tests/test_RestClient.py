@@ -0,0 +1,30 @@
+from scylla_api_client.rest import RestClient
+from scylla_api_client.api import ScyllaApiCommand
+
+
+def test_session_shared_per_node():
+    c1 = RestClient(host="1.1.1.1", port="10000")
+    c2 = RestClient(host="1.1.1.1", port="10000")
+    c3 = RestClient(host="1.1.1.1", port="10001")
+    c4 = RestClient(host="1.1.1.1", port="10000", ssl=True)
+
+    assert c1.session is c2.session
+    assert c1.session is not c3.session
+    assert c1.session is not c4.session
+
+
+def test_pool_size():
+    client = RestClient(host="2.2.2.2", port="10000", pool_size=3)
+    assert client.session.get_adapter("http://2.2.2.2:10000")._pool_maxsize == 3
+
+
+def test_methods_share_command_client():
+    command = ScyllaApiCommand(module_name="module1", command_name="command1",
+                               host="localhost", port="10000")
+    command.load_json({"path": "command1", "operations": [
+        {"method": "GET", "summary": "get", "parameters": []},
+        {"method": "POST", "summary": "post", "parameters": []},
+    ]})
+    methods = list(command.methods.values())
+    assert len(methods) == 2
+    assert all(m.rest_client is command.rest_client for m in methods)
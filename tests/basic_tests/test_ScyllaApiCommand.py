@@ -8,3 +8,53 @@ def test_command():
     assert command.module_name == "module1"
     assert command.name == "command1"
     assert len(command.methods) == 0
+
+
+def test_parser_generated_for_dispatched_method_only():
+    command = ScyllaApiCommand(module_name="module1", command_name="command1/{name}",
+                               host="localhost", port="10000")
+    command.load_json({"path": "command1/{name}", "operations": [
+        {"method": "GET", "summary": "get", "parameters": [
+            {"name": "name", "description": "name", "required": True, "type": "string", "paramType": "path"}]},
+        {"method": "POST", "summary": "post", "parameters": [
+            {"name": "name", "description": "name", "required": True, "type": "string", "paramType": "path"},
+            {"name": "level", "description": "level", "required": True, "type": "string", "paramType": "query"}]},
+    ]})
+    get = command.methods[ScyllaApiCommand.Method.GET]
+    post = command.methods[ScyllaApiCommand.Method.POST]
+
+    method, args = command.parse_invocation(["POST", "--name", "n1", "--level", "debug"])
+    assert method is post
+    assert args == {"name": ["n1"], "level": ["debug"]}
+    assert post.parser is not None
+    assert get.parser is None
+
+    assert command.parse_invocation(["GET", "--help"]) is None
+    assert get.parser is None
+    assert get.get_help() is get.get_help()
+    assert "usage: module1 command1/{name} GET --name NAME" in get.get_help()
+
+
+def test_request_builder():
+    command = ScyllaApiCommand(module_name="module1", command_name="command1/{name}",
+                               host="localhost", port="10000")
+    command.load_json({"path": "command1/{name}", "operations": [
+        {"method": "POST", "summary": "post", "parameters": [
+            {"name": "name", "description": "name", "required": True, "type": "string", "paramType": "path"},
+            {"name": "level", "description": "level", "required": False, "type": "string", "paramType": "query"},
+            {"name": "cf", "description": "cf", "required": False, "type": "string", "paramType": "query"}]},
+    ]})
+    post = command.methods[ScyllaApiCommand.Method.POST]
+    builder = post.get_request_builder(command.name_format)
+    assert builder is post.get_request_builder(command.name_format)
+    assert builder.path_names == ("name",) and builder.query_names == ("level", "cf")
+
+    args = {"name": ["n%1"], "level": ["debug"], "cf": ["t1", "t2"], "other": 1}
+    assert post.build_request(command.name_format, args) == ("/module1/command1/n%1", {"level": "debug", "cf": "t1,t2"})
+    assert args == {"other": 1}
+    assert post.build_request(command.name_format, {"name": "n1"}) == ("/module1/command1/n1", {})
+
+    from pytest import raises
+    from scylla_api_client.api import MissingArgumentError
+    with raises(MissingArgumentError, match="command1/{name} POST: missing required value path argument 'name'"):
+        post.build_request(command.name_format, {"level": ["debug"]})
@@ -1,3 +1,6 @@
+import threading
+import time
+
 from pytest import fixture
 from scylla_api_client.api import ScyllaApiModule, OrderedDict
 
@@ -18,3 +21,50 @@ def test_Module(list_command):
         assert command in module.commands.keys()
         assert list(module.commands.keys())[pos] == command
         assert module.commands[command] == list_command[command]
+
+
+class FakeCommand:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_failed_load_is_retried():
+    attempts = []
+
+    def loader(module, commands):
+        attempts.append(module.name)
+        if len(attempts) == 1:
+            return False
+        commands.insert("compaction", FakeCommand("compaction"))
+        return True
+
+    module = ScyllaApiModule(name="test1", loader=loader)
+    assert not module.loaded
+    assert list(module.commands.keys()) == []
+    assert not module.loaded
+    assert list(module.commands.keys()) == ["compaction"]
+    assert module.loaded
+    assert list(module.commands.keys()) == ["compaction"]
+    assert attempts == ["test1", "test1"]
+
+
+def test_concurrent_first_access():
+    attempts = []
+
+    def loader(module, commands):
+        attempts.append(module.name)
+        commands.insert("compaction", FakeCommand("compaction"))
+        # other threads reach the module while it is loading
+        time.sleep(0.1)
+        commands.insert("nodetool", FakeCommand("nodetool"))
+        return True
+
+    module = ScyllaApiModule(name="test1", loader=loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(list(module.commands.keys()))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [["compaction", "nodetool"]] * 8
+    assert attempts == ["test1"]
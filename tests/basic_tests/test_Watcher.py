@@ -0,0 +1,45 @@
+from scylla_api_client.watch import Watcher
+
+
+class Response:
+    def __init__(self, value, status_code=200):
+        self.value = value
+        self.status_code = status_code
+
+    def json(self):
+        return self.value
+
+
+class FakeClient:
+    """Replays pending_tasks values and node uptimes"""
+    def __init__(self, values, uptimes):
+        self.values = list(values)
+        self.uptimes = list(uptimes)
+
+    def dispatch_rest_method(self, rest_method_kind, resource_path, query_params, use_cache=True, path_template=None):
+        return Response(self.values.pop(0))
+
+    def get(self, resource_path):
+        assert resource_path == "/system/uptime_ms"
+        return Response(self.uptimes.pop(0))
+
+
+def test_watch_deltas_and_restart(capsys):
+    client = FakeClient(values=[10, 14, 20, 3, 5], uptimes=[1000, 1100, 1200, 50, 150])
+    watcher = Watcher(client, "GET", "/compaction_manager/metrics/pending_tasks", {}, interval=0.01)
+    watcher.run(count=5)
+
+    lines = [line.split("  ", 1)[1] for line in capsys.readouterr().out.splitlines()]
+    assert len(lines) == 5
+    assert lines[0] == "10"
+    assert lines[1].startswith("14  delta=+4  rate=")
+    assert lines[2].startswith("20  delta=+6  rate=")
+    assert lines[3] == "3  (node restarted)"
+    assert lines[4].startswith("5  delta=+2  rate=")
+
+
+def test_watch_non_numeric(capsys):
+    client = FakeClient(values=[{"a": 1}, {"a": 2}], uptimes=[1, 2])
+    Watcher(client, "GET", "/x", {}, interval=0.01).run(count=2)
+    lines = [line.split("  ", 1)[1] for line in capsys.readouterr().out.splitlines()]
+    assert lines == ['{"a": 1}', '{"a": 2}']
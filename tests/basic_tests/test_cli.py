@@ -0,0 +1,22 @@
+import pytest
+
+from scylla_api_client.cli import main
+
+
+def api_loader(**kwargs):
+    raise AssertionError("the api is not loaded")
+
+
+@pytest.mark.parametrize("option,value,message", [
+    ("--max-concurrency", "0", "Invalid max concurrency option:"),
+    ("--max-concurrency", "-1", "Invalid max concurrency option:"),
+    ("--max-concurrency", "x", "Invalid max concurrency option:"),
+    ("--parallel", "0", "Invalid parallel option:"),
+    ("--parallel", "-2", "Invalid parallel option:"),
+    ("--parallel", "x", "Invalid parallel option:"),
+])
+def test_invalid_option(option, value, message, capsys):
+    with pytest.raises(SystemExit) as e:
+        main([f"{option}={value}", "system/uptime_ms"], api_loader=api_loader)
+    assert e.value.code == 1
+    assert capsys.readouterr().out.startswith(message)
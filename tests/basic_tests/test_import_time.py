@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# cumulative import time of the cli module, in microseconds, with a wide margin
+# over a typical ~60ms so that slow machines do not fail it
+CLI_IMPORT_BUDGET_US = 150000
+
+# modules only imported on the paths that send requests or serve http
+HEAVY_MODULES = ["requests", "urllib3", "http.server", "concurrent.futures", "pprint"]
+
+
+def import_times(args) -> dict:
+    """Run python -X importtime with args, returning the cumulative import time of each module"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    res = subprocess.run([sys.executable, "-X", "importtime"] + args, env=env, cwd=REPO_DIR,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = dict()
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def assert_light(times:dict):
+    assert times
+    heavy = [name for name in times if name in HEAVY_MODULES]
+    assert not heavy
+
+
+def test_cli_import_is_light():
+    times = import_times(["-c", "import scylla_api_client.cli"])
+    assert_light(times)
+    assert times["scylla_api_client.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_help_does_not_import_requests():
+    assert_light(import_times(["-m", "scylla_api_client", "--help"]))
+
+
+def test_main_import_is_light():
+    # daemon-forwarded commands and completion lookups run on __main__ alone
+    assert_light(import_times(["-c", "import scylla_api_client.__main__"]))
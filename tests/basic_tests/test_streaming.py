@@ -0,0 +1,34 @@
+import io
+import json
+
+import pytest
+
+from scylla_api_client.streaming import iter_json_array, write_stream
+
+
+def chunked(data:bytes, size:int):
+    return [data[i:i+size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 1024])
+def test_iter_json_array(size):
+    values = [{"ks": "ks1", "cf": f"t{i}", "task": i} for i in range(20)] + [12.5, -3e-2, "a], b", None, True]
+    doc = json.dumps(values, indent=2, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array(chunked(doc, size))) == values
+
+
+def test_iter_json_not_array():
+    assert list(iter_json_array([b' 12', b'34 '])) == [1234]
+    assert list(iter_json_array([b'{"a":', b' [1, 2]}'])) == [{"a": [1, 2]}]
+    assert list(iter_json_array([b'[', b' ]'])) == []
+
+
+def test_iter_json_array_truncated():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1, 2']))
+
+
+def test_write_stream():
+    out = io.BytesIO()
+    assert not write_stream(chunked(b'"caf\xc3\xa9"', 1), out)
+    assert out.getvalue() == b'"caf\xc3\xa9"'
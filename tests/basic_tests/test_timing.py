@@ -0,0 +1,70 @@
+import pytest
+
+from scylla_api_client import timing
+from scylla_api_client.rest.scylla_rest_client import ScyllaRestClient
+
+
+@pytest.fixture(autouse=True)
+def reset_timing():
+    timing.reset(latencies=True)
+    yield
+    timing.reset(latencies=True)
+
+
+def test_histogram_percentiles():
+    histogram = timing.LatencyHistogram()
+    for i in range(1, 101):
+        histogram.add(i / 1000)
+    stats = histogram.stats()
+    assert stats['count'] == 100
+    assert stats['min'] == 0.001 and stats['max'] == 0.1
+    assert stats['mean'] == pytest.approx(0.0505)
+    # bucket upper bounds are within 10% of the exact percentiles
+    assert 0.050 <= stats['p50'] <= 0.050 * 1.1
+    assert 0.095 <= stats['p95'] <= 0.095 * 1.1
+    assert 0.099 <= stats['p99'] <= 0.1
+
+
+def test_histogram_tiny_and_empty():
+    histogram = timing.LatencyHistogram()
+    assert histogram.percentile(50) is None
+    histogram.add(0.0)
+    assert histogram.percentile(99) == 0.0
+
+
+def test_phases_accumulate():
+    with timing.phase('a'):
+        pass
+    timing.record_phase('a', 0.5)
+    timing.record_phase('b', 0.25)
+    names = [(name, count) for name, count, total in timing.phases()]
+    assert names == [('a', 2), ('b', 1)]
+    assert timing.phases()[0][2] >= 0.5
+
+
+def test_dispatch_records_latency():
+    client = ScyllaRestClient(host="3.3.3.3", port="10000")
+    client.get = lambda **kwargs: "response"
+    for _ in range(3):
+        assert client.dispatch_rest_method(rest_method_kind="GET", resource_path="/system/uptime_ms") == "response"
+    histograms = timing.latency_histograms()
+    assert list(histograms) == ["GET /system/uptime_ms"]
+    assert histograms["GET /system/uptime_ms"]['count'] == 3
+    assert ('request', 3) == timing.phases()[0][:2]
+
+    report = timing.format_report()
+    assert "GET /system/uptime_ms" in report
+    timing.reset()
+    assert timing.phases() == []
+    assert timing.latency_histograms()
+
+
+def test_latency_keyed_on_path_template():
+    client = ScyllaRestClient(host="3.3.3.3", port="10000")
+    client.get = lambda **kwargs: "response"
+    for name in ["httpd", "api", "storage_proxy"]:
+        client.dispatch_rest_method(rest_method_kind="GET", path_template="/system/logger/{name}",
+                                    resource_path=f"/system/logger/{name}")
+    histograms = timing.latency_histograms()
+    assert list(histograms) == ["GET /system/logger/{name}"]
+    assert histograms["GET /system/logger/{name}"]['count'] == 3
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of schema loading and command dispatch against a local stand-in
+server, serving synthetic swagger 1.2 and v2 documents at a realistic scale.
+
+    python tests/benchmarks/bench_scylla_api.py --output results.json
+    python tests/benchmarks/bench_scylla_api.py --compare results.json
+
+Results are written as json, to compare them across commits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_DIR)
+# the stand-in server of the api tests
+sys.path.insert(0, os.path.join(REPO_DIR, "tests", "api_tests"))
+
+from conftest import ScyllaAPIBasicRequestHandler  # noqa: E402
+
+from scylla_api_client import cli  # noqa: E402
+from scylla_api_client.api import ScyllaApi  # noqa: E402
+
+TYPES = ["string", "integer", "long", "boolean", "double", "array"]
+
+
+def generate_v1_module(module:str, commands:int, max_options:int, rng:random.Random) -> dict:
+    apis = []
+    for c in range(commands):
+        path = f"/{module}/command_{c}"
+        if c % 5 == 0:
+            path += "/{name}"
+        operations = []
+        for method in ["GET", "POST", "DELETE"][:rng.randint(1, 3)]:
+            parameters = []
+            if "{name}" in path:
+                parameters.append({"name": "name", "description": "The name", "required": True,
+                                   "allowMultiple": False, "type": "string", "paramType": "path"})
+            for o in range(rng.randint(0, max_options)):
+                param = {"name": f"option_{o}", "description": f"Option {o} of {path}",
+                         "required": False, "allowMultiple": False, "type": rng.choice(TYPES),
+                         "paramType": "query"}
+                if o % 4 == 0:
+                    param["type"] = "string"
+                    param["enum"] = ["error", "warn", "info", "debug", "trace"]
+                parameters.append(param)
+            operations.append({"method": method, "summary": f"{method} {path}", "type": "string",
+                               "nickname": f"{method.lower()}_{module}_{c}", "produces": ["application/json"],
+                               "parameters": parameters})
+        apis.append({"path": path, "operations": operations})
+    return {"apiVersion": "0.0.1", "swaggerVersion": "1.2", "basePath": "http://127.0.0.1:10000",
+            "resourcePath": f"/{module}", "produces": ["application/json"], "apis": apis}
+
+
+def generate_v2(commands:int, max_options:int, rng:random.Random) -> dict:
+    paths = dict()
+    for c in range(commands):
+        parameters = [{"in": "query", "name": f"option_{o}", "description": f"Option {o}", "required": False,
+                       "type": rng.choice(TYPES)} for o in range(rng.randint(0, max_options))]
+        paths[f"/v2/config/option_{c}"] = {"get": {"description": f"Get config option {c}", "operationId": f"get_{c}",
+                                                   "produces": ["application/json"], "parameters": parameters,
+                                                   "responses": {"200": {"description": "OK"}}}}
+    return {"swagger": "2.0", "info": {"version": "1.0.0", "title": "Scylla API"}, "host": "localhost:10000",
+            "basePath": "/", "schemes": ["http"], "paths": paths}
+
+
+class SyntheticApi:
+    def __init__(self, modules:int, commands:int, max_options:int, v2_commands:int, seed:int=0):
+        rng = random.Random(seed)
+        self.module_names = [f"module_{m}" for m in range(modules)]
+        self.documents = {"/api-doc": {"apiVersion": "0.0.1", "swaggerVersion": "1.2",
+                                       "apis": [{"path": f"/{name}", "description": f"The {name} API"}
+                                                for name in self.module_names]}}
+        for name in self.module_names:
+            self.documents[f"/api-doc/{name}/"] = generate_v1_module(name, commands, max_options, rng)
+        self.documents["/v2"] = generate_v2(v2_commands, max_options, rng)
+        self.encoded = {path: json.dumps(doc).encode("utf-8") for path, doc in self.documents.items()}
+
+    def scale(self) -> dict:
+        commands = 0
+        options = 0
+        for path, doc in self.documents.items():
+            if path.startswith("/api-doc/"):
+                for api in doc["apis"]:
+                    commands += 1
+                    options += sum(len(op["parameters"]) for op in api["operations"])
+            elif path == "/v2":
+                for ops in doc["paths"].values():
+                    commands += 1
+                    options += sum(len(op["parameters"]) for op in ops.values())
+        return {"modules": len(self.module_names) + 1, "commands": commands, "options": options,
+                "schema_bytes": sum(len(body) for body in self.encoded.values())}
+
+
+class SyntheticRequestHandler(ScyllaAPIBasicRequestHandler):
+    # keep-alive, as the client pools its connections
+    protocol_version = "HTTP/1.1"
+    # the headers and body are written separately, do not let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        content = self.server.api.encoded.get(self.path)
+        if content is None:
+            return super().do_GET()
+        self._send_response(content)
+
+    do_POST = do_GET
+    do_DELETE = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, api:SyntheticApi):
+        self.api = api
+        super().__init__(("127.0.0.1", 0), SyntheticRequestHandler)
+
+
+def summarize(samples:list) -> dict:
+    return {"runs": len(samples), "min": min(samples), "median": statistics.median(samples),
+            "mean": statistics.mean(samples), "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0}
+
+
+def bench_load(port:int, repeat:int) -> dict:
+    index = []
+    full = []
+    for _ in range(repeat):
+        scylla_api = ScyllaApi("127.0.0.1", port)
+        start = time.perf_counter()
+        scylla_api.load()
+        index.append(time.perf_counter() - start)
+        scylla_api.load_all()
+        full.append(time.perf_counter() - start)
+    return {"load_seconds": summarize(index), "load_all_seconds": summarize(full)}
+
+
+def bench_memory(port:int) -> dict:
+    tracemalloc.start()
+    scylla_api = ScyllaApi("127.0.0.1", port)
+    scylla_api.load()
+    scylla_api.load_all()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del scylla_api
+    return {"loaded_api_bytes": current, "load_all_peak_bytes": peak}
+
+
+def bench_cli_main(port:int, repeat:int) -> dict:
+    argv = ["-p", str(port), "--no-schema-cache", "module_0/command_1", "GET"]
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                cli.main(argv)
+            except SystemExit:
+                pass
+        samples.append(time.perf_counter() - start)
+    return {"cli_main_seconds": summarize(samples)}
+
+
+def bench_cold_start(port:int, repeat:int) -> dict:
+    cmd = [sys.executable, "-m", "scylla_api_client", "--no-daemon", "-p", str(port), "--no-schema-cache",
+           "module_0/command_1", "GET"]
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return {"cold_start_seconds": summarize(samples)}
+
+
+def bench_invoke(port:int, seconds:float) -> dict:
+    scylla_api = ScyllaApi("127.0.0.1", port)
+    scylla_api.load()
+    command, argv = scylla_api.find_command(["module_0/command_1", "GET"])
+    out = io.BytesIO()
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        command.invoke("127.0.0.1", port, argv, out=out)
+        out.seek(0)
+        out.truncate()
+        calls += 1
+    elapsed = time.perf_counter() - start
+    return {"invoke_per_second": calls / elapsed, "invoke_calls": calls}
+
+
+def run(args) -> dict:
+    api = SyntheticApi(args.modules, args.commands, args.max_options, args.v2_commands, seed=args.seed)
+    server = BenchServer(api)
+    Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    results = dict()
+    try:
+        results.update(bench_load(port, args.repeat))
+        results.update(bench_memory(port))
+        results.update(bench_cli_main(port, args.repeat))
+        results.update(bench_invoke(port, args.invoke_seconds))
+        if not args.no_cold_start:
+            results.update(bench_cold_start(port, args.repeat))
+    finally:
+        server.shutdown()
+        server.server_close()
+    results["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"meta": {"timestamp": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+                     "commit": git_commit(), "scale": api.scale()},
+            "results": results}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results:dict) -> dict:
+    """Return the comparable value of each result: the median of timings, the value of the others."""
+    values = dict()
+    for name, value in results.items():
+        values[name] = value["median"] if isinstance(value, dict) else value
+    return values
+
+
+def compare(baseline:dict, current:dict) -> str:
+    old = flatten(baseline["results"])
+    new = flatten(current["results"])
+    lines = [f"{'benchmark':<24} {'baseline':>14} {'current':>14} {'ratio':>8}"]
+    for name in new:
+        if name in old and old[name]:
+            lines.append(f"{name:<24} {old[name]:>14.6g} {new[name]:>14.6g} {new[name] / old[name]:>8.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=20, help="Number of swagger 1.2 modules (default: 20)")
+    parser.add_argument("--commands", type=int, default=25, help="Number of commands per module (default: 25)")
+    parser.add_argument("--max-options", type=int, default=12, help="Maximum number of options per method (default: 12)")
+    parser.add_argument("--v2-commands", type=int, default=100, help="Number of v2 commands (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of each timed benchmark (default: 5)")
+    parser.add_argument("--invoke-seconds", type=float, default=2.0, help="Duration of the invoke benchmark (default: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic documents (default: 0)")
+    parser.add_argument("--no-cold-start", action="store_true", help="Skip the cli subprocess benchmark")
+    parser.add_argument("--output", help="Write the results to a json file, instead of stdout")
+    parser.add_argument("--compare", help="Print the ratios of the results to those of a previous results file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), results), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()